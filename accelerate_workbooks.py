@@ -1,31 +1,119 @@
-import requests  # Contains methods used to make HTTP requests
-import requests
-from urllib3.exceptions import InsecureRequestWarning
 import xml.etree.ElementTree as ET  # Contains methods used to build and parse XML
 import sys
 
 import argparse
+import atexit
+import csv
 import getpass
+import hashlib
+import importlib
+import io
+import json
 import logging
 import os
-from tabulate import tabulate
+import re
+import sqlite3
 
-from dateutil import tz
+import weakref
+from urllib.parse import quote, urlsplit
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from threading import Lock, current_thread, main_thread
+from time import monotonic, process_time, sleep
 
-import tableauserverclient as TSC
-from collections import defaultdict
-from datetime import time, timedelta
 
-from tableauserverclient import ServerResponseError
+class LazyModule:
+    """
+    A module imported when one of its attributes is first read, which then replaces this object
+    as the global 'alias' of the script. requests, Tableau Server Client, tabulate and dateutil take
+    most of the start up time, so --logout without a session and invalid options do not import them.
+    """
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attribute)
 
-# The following packages are used to build a multi-part/mixed request.
-# They are contained in the 'requests' library
-from requests.packages.urllib3.fields import RequestField
-from requests.packages.urllib3.filepost import encode_multipart_formdata
+
+requests = LazyModule("requests", "requests")  # Contains methods used to make HTTP requests
+TSC = LazyModule("tableauserverclient", "TSC")
+tz = LazyModule("dateutil.tz", "tz")
+dateutil_parser = LazyModule("dateutil.parser", "dateutil_parser")
+tabulate = LazyModule("tabulate", "tabulate")
+cProfile = LazyModule("cProfile", "cProfile")
+pstats = LazyModule("pstats", "pstats")
+tracemalloc = LazyModule("tracemalloc", "tracemalloc")
+
+
+def lazy_subclass(mixin, base):
+    """
+    Returns the class made of 'mixin' on top of 'base', created once.
+    The classes that extend requests and TSC classes are written as mixins, so their bases are only
+    imported when they are first used.
+    """
+    if (mixin, base) not in _lazy_subclasses:
+        _lazy_subclasses[(mixin, base)] = type(mixin.__name__, (mixin, base), {})
+    return _lazy_subclasses[(mixin, base)]
+
+
+_lazy_subclasses = dict()
 
 # page size for outputting
 PAGE_SIZE = 30
 
+# number of concurrent requests used by the stages that query the server per workbook
+DEFAULT_WORKERS = 8
+
+# number of times a bulk request is retried after a transient failure, and the first delay between retries
+DEFAULT_RETRIES = 3
+RETRY_DELAY = 1.0  # seconds, doubled after every retry
+
+# how far back the job history is read when looking for the last Workbook Acceleration jobs
+JOB_HISTORY_DAYS = 30
+
+# the largest page size accepted by the REST API
+MAX_PAGE_SIZE = 1000
+
+# the longest url encoded value of an 'in' filter, which keeps request urls well under server limits
+MAX_IN_FILTER_LENGTH = 2000
+
+# --type project-path scans all the workbooks instead of filtering them by project name
+# when the project and its sub-projects are more than this share of the projects on the site
+FULL_SCAN_PROJECT_RATIO = 0.5
+
+# seconds a GET response is reused within one run, by resource type; 0 disables the reuse.
+# Job results are polled for completion, so they are always read again
+RESPONSE_CACHE_TTL = {"serverInfo": 3600, "sites": 300, "schedules": 60, "projects": 60,
+                      "workbooks": 30, "tasks": 30, "dataAccelerationReport": 30, "jobs": 0}
+RESPONSE_CACHE_SIZE = 128  # responses kept at most, the least recently used are dropped first
+
+# a write to the resource type on the left also changes the resource types on the right
+RESPONSE_CACHE_INVALIDATIONS = {"workbooks": ["workbooks", "tasks", "dataAccelerationReport"],
+                                "schedules": ["schedules", "tasks"],
+                                "tasks": ["tasks"]}
+
+# the workbook attributes the commands read; workbook queries ask only for these on servers that support it.
+# showTabs and owner.id are sent back when a workbook is updated, so they are needed to not change them
+WORKBOOK_FIELDS = ["id", "name", "contentUrl", "showTabs", "updatedAt", "project.id", "project.name",
+                   "owner.id", "dataAccelerationConfig"]
+
+# upper bounds in milliseconds of the latency histogram buckets kept by --metrics, the last one is open ended
+METRICS_LATENCY_BUCKETS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# allocation sites listed per phase by --profile, and functions listed from the cProfile stats
+PROFILE_TOP_ALLOCATIONS = 10
+PROFILE_TOP_FUNCTIONS = 30
+
+# projects and workbooks updated this long before the previous sync of the metadata cache are
+# downloaded again, so clock differences between the server and this machine do not lose updates
+CACHE_SYNC_OVERLAP = timedelta(minutes=10)
+
 # The namespace for the REST API is 'http://tableausoftware.com/api' for Tableau Server 9.0
 # or 'http://tableau.com/api' for Tableau Server 9.1 or later
 xmlns = {'t': 'http://tableau.com/api'}
@@ -33,6 +121,10 @@ xmlns = {'t': 'http://tableau.com/api'}
 VERSION = 3.6
 tokenFile = ".token_profile"
 
+# server version and site record of the signed in session, reused without any request while fresh
+sessionCacheFile = ".session_cache"
+SESSION_CACHE_TTL = 300  # seconds
+
 # The maximum size of a file that can be published in a single request is 64MB
 FILESIZE_LIMIT = 1024 * 1024 * 64  # 64MB
 
@@ -106,7 +198,7 @@ def sign_in_to_server(server, username, password, site="", ssl_cert_pem=None):
     xml_request = ET.tostring(xml_request)
 
     # Make the request to server
-    server_response = requests.post(url, data=xml_request, verify=ssl_cert_pem)
+    server_response = get_http_session().post(url, data=xml_request, verify=ssl_cert_pem)
     _check_status(server_response, 200)
 
     # ASCII encode server response to enable displaying to console
@@ -149,14 +241,60 @@ def _check_status(server_response, success_code):
 
 
 def removeTokenFile():
-    if os.path.exists(tokenFile):
-        try:
-            os.remove(tokenFile)
-        except OSError as e:
-            pass
+    for file_name in [tokenFile, sessionCacheFile]:
+        if os.path.exists(file_name):
+            try:
+                os.remove(file_name)
+            except OSError as e:
+                pass
+
+
+def hashToken(auth_token):
+    return hashlib.sha256(auth_token.encode("utf-8")).hexdigest()
+
+
+def writeSessionCache(auth_token, server_version, site):
+    if is_replaying():
+        return
+    session_cache = {
+        "token": hashToken(auth_token),
+        "cached_at": datetime.now().timestamp(),
+        "server_version": server_version,
+        "site": {"id": site.id, "name": site.name, "content_url": site.content_url,
+                 "data_acceleration_mode": site.data_acceleration_mode}
+    }
+    try:
+        with open(sessionCacheFile, "w") as f:
+            json.dump(session_cache, f)
+    except (IOError, OSError):
+        pass
+
+
+def readSessionCache(auth_token):
+    """
+    Returns the cached server version and site record of the session of auth_token,
+    or None when there is no cache for that token or it is older than SESSION_CACHE_TTL.
+    """
+    if get_http_session().cassette is not None:
+        # recorded and replayed runs always validate the session, so a replay sends the requests of the recording
+        return None
+    try:
+        with open(sessionCacheFile, "r") as f:
+            session_cache = json.load(f)
+        if session_cache["token"] != hashToken(auth_token) or \
+                not 0 <= datetime.now().timestamp() - session_cache["cached_at"] < SESSION_CACHE_TTL:
+            return None
+        site = TSC.SiteItem(session_cache["site"]["name"], session_cache["site"]["content_url"],
+                            data_acceleration_mode=session_cache["site"]["data_acceleration_mode"])
+        site._id = session_cache["site"]["id"]
+        return session_cache["server_version"], site
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
 
 
 def writeTokenToFile(token="", site_id="", user_id="", server_url="", ssl_cert_pem=""):
+    if is_replaying():
+        return
     f = open(tokenFile, "w+")
     f.write(token + " " + site_id + " " + user_id + " " + server_url + " " + ssl_cert_pem)
     f.close()
@@ -234,22 +372,735 @@ def set_up_tsc_server(serverurl, site_id, user_id,
                       auth_token, ssl_cert_pem):
     server = TSC.Server(serverurl)
 
+    server._session = get_http_session()
     if "https:" in serverurl.lower():
-        server.add_http_options({'verify': ssl_cert_pem if len(ssl_cert_pem) > 0 else False})
+        # set on the session for the requests sent outside TSC, and for every TSC request
+        # so that REQUESTS_CA_BUNDLE cannot override it
+        server._session.verify = ssl_cert_pem if len(ssl_cert_pem) > 0 else False
+        server.add_http_options({'verify': server._session.verify})
 
     server._set_auth(site_id, user_id, auth_token)
 
+    session_cache = readSessionCache(auth_token)
+    if session_cache is not None:
+        # the session was validated less than SESSION_CACHE_TTL ago
+        server.version, _current_sites[server] = session_cache
+        return server
+
     server.use_server_version()
 
     return server if connection_alive(server) else None
 
 
 def connection_alive(server):
+    # looking up the signed in site is a single small request that fails when the token is not valid
     try:
-        server.sites.get()
-        return True
+        site = server.sites.get_by_id(server.site_id)
     except Exception:
         return False
+    _current_sites[server] = site
+    writeSessionCache(server.auth_token, server.version, site)
+    return True
+
+
+class MemoizingSession:
+    """
+    Mixed into a requests.Session by get_http_session, a session that reuses the responses of repeated
+    GET requests for RESPONSE_CACHE_TTL seconds, keeping at most RESPONSE_CACHE_SIZE of them. Any other
+    request drops the cached responses of the resource types it changes (see RESPONSE_CACHE_INVALIDATIONS);
+    unknown writes drop all of them.
+    """
+
+    SITE_RESOURCE_TYPE_PATTERN = re.compile(r"/api/[^/]+/sites/[^/?]+/([^/?]+)")
+    RESOURCE_TYPE_PATTERN = re.compile(r"/api/[^/]+/([^/?]+)")
+
+    def __init__(self):
+        super(MemoizingSession, self).__init__()
+        self._responses = OrderedDict()
+        self._lock = Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.responses_received = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.metrics = None  # a RequestMetrics with --metrics
+        self.cassette = None  # a Cassette with --record or --replay
+
+    @classmethod
+    def resource_type(cls, url):
+        # /api/<version>/sites/<site id>/<resource type>/... or /api/<version>/<resource type>/...
+        match = cls.SITE_RESOURCE_TYPE_PATTERN.search(url) or cls.RESOURCE_TYPE_PATTERN.search(url)
+        return match.group(1) if match is not None else None
+
+    def request(self, method, url, *args, **kwargs):
+        resource_type = MemoizingSession.resource_type(url)
+        if method.upper() != "GET":
+            response = super(MemoizingSession, self).request(method, url, *args, **kwargs)
+            self.invalidate(RESPONSE_CACHE_INVALIDATIONS.get(resource_type))
+            return response
+
+        ttl = RESPONSE_CACHE_TTL.get(resource_type, 0)
+        if ttl <= 0 or kwargs.get("stream"):
+            return super(MemoizingSession, self).request(method, url, *args, **kwargs)
+
+        # TSC sends the query options as params from REST API 3.7, and in the url before that
+        key = (url, repr(sorted((kwargs.get("params") or {}).items())),
+               repr(sorted((kwargs.get("headers") or {}).items())))
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None and monotonic() - cached[0] < ttl:
+                self._responses.move_to_end(key)
+                self.hits[resource_type] += 1
+                if self.metrics is not None:
+                    self.metrics.record_cache_hit(method, url)
+                if get_trace_recorder() is not None:
+                    get_trace_recorder().add_instant(RequestMetrics.endpoint(method, url), "cache", {"url": url})
+                return cached[1]
+            self.misses[resource_type] += 1
+
+        response = super(MemoizingSession, self).request(method, url, *args, **kwargs)
+        if response.status_code == 200:
+            response.content  # read the body before the response is shared
+            with self._lock:
+                self._responses[key] = monotonic(), response
+                self._responses.move_to_end(key)
+                while len(self._responses) > RESPONSE_CACHE_SIZE:
+                    self._responses.popitem(last=False)
+        return response
+
+    def send(self, request, **kwargs):
+        started_at = monotonic()
+        if self.cassette is not None and self.cassette.replaying:
+            response = self.cassette.replay(request)
+        else:
+            response = super(MemoizingSession, self).send(request, **kwargs)
+            if self.cassette is not None and not kwargs.get("stream"):
+                self.cassette.record(request, response, monotonic() - started_at)
+        received_length = None
+        if not kwargs.get("stream"):
+            # Content-Length is the size on the wire when the response is compressed
+            decoded_length = len(response.content)
+            received_length = int(response.headers.get("Content-Length", decoded_length))
+            with self._lock:
+                self.responses_received += 1
+                self.bytes_received += received_length
+                self.bytes_decoded += decoded_length
+            if self.metrics is not None:
+                self.metrics.record(request.method, request.url, response.status_code,
+                                    monotonic() - started_at, received_length)
+        if get_trace_recorder() is not None:
+            get_trace_recorder().add_span(
+                RequestMetrics.endpoint(request.method, request.url), "http", started_at, monotonic(),
+                {"url": request.url, "status": response.status_code, "bytes": received_length})
+        return response
+
+    def invalidate(self, resource_types=None):
+        with self._lock:
+            if resource_types is None:
+                self._responses.clear()
+                return
+            for key in list(self._responses.keys()):
+                if MemoizingSession.resource_type(key[0]) in resource_types:
+                    del self._responses[key]
+
+    def log_statistics(self):
+        logging.info("Received {:,} bytes ({:,} bytes uncompressed) in {} responses".format(
+            self.bytes_received, self.bytes_decoded, self.responses_received))
+        for resource_type in sorted(set(self.hits) | set(self.misses)):
+            logging.debug("Response cache for {}: {} hits, {} misses".format(
+                resource_type, self.hits[resource_type], self.misses[resource_type]))
+
+
+class RequestMetrics:
+    """
+    Counts the requests of the run by endpoint, the HTTP method and the url path with the ids replaced
+    by {id}, with their errors, bytes received and a histogram of their latency (see METRICS_LATENCY_BUCKETS).
+    Sign in and TSC requests are all sent by the shared session, which records them here with --metrics.
+    """
+
+    API_VERSION_PATTERN = re.compile(r"^/api/[^/]+")
+    # the path segment after one of these is the id of an item of the collection
+    COLLECTIONS = {"sites", "projects", "workbooks", "views", "datasources", "users", "groups", "schedules",
+                   "jobs", "dataAcceleration", "extractRefreshes", "subscriptions", "flows"}
+
+    def __init__(self):
+        self.started_at = monotonic()
+        self._lock = Lock()
+        self.endpoints = defaultdict(lambda: {"requests": 0, "errors": 0, "cache_hits": 0, "bytes": 0,
+                                              "seconds": 0.0, "max_seconds": 0.0,
+                                              "histogram": [0] * (len(METRICS_LATENCY_BUCKETS) + 1)})
+
+    @classmethod
+    def endpoint(cls, method, url):
+        segments = cls.API_VERSION_PATTERN.sub("", urlsplit(url).path).split("/")
+        for i in range(1, len(segments)):
+            if segments[i - 1] in cls.COLLECTIONS and segments[i] not in cls.COLLECTIONS:
+                segments[i] = "{id}"
+        return "{} {}".format(method.upper(), "/".join(segments))
+
+    def record(self, method, url, status_code, seconds, received_length):
+        milliseconds = seconds * 1000
+        bucket = len(METRICS_LATENCY_BUCKETS)
+        for i, upper_bound in enumerate(METRICS_LATENCY_BUCKETS):
+            if milliseconds <= upper_bound:
+                bucket = i
+                break
+        with self._lock:
+            metrics = self.endpoints[RequestMetrics.endpoint(method, url)]
+            metrics["requests"] += 1
+            metrics["errors"] += 1 if status_code >= 400 else 0
+            metrics["bytes"] += received_length
+            metrics["seconds"] += seconds
+            metrics["max_seconds"] = max(metrics["max_seconds"], seconds)
+            metrics["histogram"][bucket] += 1
+
+    def record_cache_hit(self, method, url):
+        with self._lock:
+            self.endpoints[RequestMetrics.endpoint(method, url)]["cache_hits"] += 1
+
+    def to_json(self):
+        with self._lock:
+            return {"wall_seconds": monotonic() - self.started_at,
+                    "bytes_received": sum(metrics["bytes"] for metrics in self.endpoints.values()),
+                    "latency_buckets_ms": METRICS_LATENCY_BUCKETS + [None],
+                    "endpoints": {endpoint: dict(metrics) for endpoint, metrics in sorted(self.endpoints.items())}}
+
+    def write(self, file_name):
+        """
+        Writes the metrics as JSON to 'file_name', or prints them as a table to stderr when it is '-',
+        so they do not mix with a csv or jsonl report on stdout.
+        """
+        metrics = self.to_json()
+        if file_name != "-":
+            try:
+                with open(file_name, "w") as f:
+                    json.dump(metrics, f, indent=2)
+            except IOError as error:
+                print("Unable to write the metrics to {} due to {}".format(file_name, error))
+            return
+
+        bucket_names = ["<={}ms".format(upper_bound) for upper_bound in METRICS_LATENCY_BUCKETS] + \
+                       [">{}ms".format(METRICS_LATENCY_BUCKETS[-1])]
+        rows = list()
+        for endpoint, endpoint_metrics in metrics["endpoints"].items():
+            requests_sent = endpoint_metrics["requests"]
+            histogram = endpoint_metrics["histogram"]
+            rows.append([endpoint, requests_sent, endpoint_metrics["errors"], endpoint_metrics["cache_hits"],
+                         endpoint_metrics["bytes"], round(endpoint_metrics["seconds"], 3),
+                         round(endpoint_metrics["seconds"] * 1000 / requests_sent, 1) if requests_sent else "",
+                         round(endpoint_metrics["max_seconds"] * 1000, 1),
+                         " ".join("{}:{}".format(bucket_names[i], count)
+                                  for i, count in enumerate(histogram) if count > 0)])
+        total_seconds = sum(endpoint_metrics["seconds"] for endpoint_metrics in metrics["endpoints"].values())
+        print("\nRequests by endpoint: {} requests, {:,} bytes received, {:.2f}s waiting on the server in {:.2f}s"
+              .format(sum(row[1] for row in rows), metrics["bytes_received"], total_seconds,
+                      metrics["wall_seconds"]), file=sys.stderr)
+        if rows:
+            print(tabulate.tabulate(rows, ["Endpoint", "Requests", "Errors", "Cache Hits", "Bytes", "Total s",
+                                           "Avg ms", "Max ms", "Latency"], tablefmt="pretty",
+                                    colalign=["left"] + ["right"] * 7 + ["left"]), file=sys.stderr)
+
+
+class PhaseProfiler:
+    """
+    Times the phases of a run: authentication, catalog fetch, project paths, command and table rendering.
+    The time of a phase is its own time, without the phases run inside it, so the phases add up to the run;
+    the CPU time is the time of all the threads of the process, which includes the pages fetched concurrently.
+    Phases are only timed on the main thread.
+    With --profile, the run is also profiled with cProfile and tracemalloc, which adds the peak memory of
+    every phase above the memory at its start, and the largest allocations left by the first call of every
+    phase. Both include the phases run inside it. The snapshots these take are not part of any phase.
+    """
+
+    def __init__(self, profile_file=None):
+        self.profile_file = profile_file
+        self.started_at = monotonic()
+        self.overhead_seconds = 0.0
+        self.phases = OrderedDict()
+        self._stack = list()
+        self._profile = None
+
+    def start(self):
+        """
+        Starts cProfile and tracemalloc, when the run is profiled.
+        """
+        if self.profile_file is None:
+            return
+        tracemalloc.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    @contextmanager
+    def phase(self, name):
+        if current_thread() is not main_thread():
+            yield
+            return
+
+        if self._stack:
+            self._pause(self._stack[-1])
+        phase = self._phase(name)
+        entry = {"phase": phase, "peak": 0, "traced": 0, "snapshot": None}
+        if self._profile is not None:
+            if phase["snapshots"] is None:
+                entry["snapshot"] = self._take_snapshot()
+                phase["snapshots"] = entry["snapshot"], None
+            entry["traced"] = tracemalloc.get_traced_memory()[0]
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        self._stack.append(entry)
+        entry["resumed_at"] = monotonic(), process_time()
+        started_at = entry["resumed_at"][0]
+        try:
+            yield
+        finally:
+            self._pause(entry)
+            self._stack.pop()
+            phase["calls"] += 1
+            if get_trace_recorder() is not None:
+                get_trace_recorder().add_span(name, "phase", started_at, monotonic())
+            if self._profile is not None:
+                phase["peak_bytes"] = max(phase["peak_bytes"], entry["peak"] - entry["traced"])
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], entry["peak"])
+                if entry["snapshot"] is not None:
+                    phase["snapshots"] = entry["snapshot"], self._take_snapshot()
+            if self._stack:
+                self._stack[-1]["resumed_at"] = monotonic(), process_time()
+
+    def _phase(self, name):
+        if name not in self.phases:
+            self.phases[name] = {"calls": 0, "seconds": 0.0, "cpu_seconds": 0.0, "peak_bytes": 0, "snapshots": None}
+        return self.phases[name]
+
+    def _pause(self, entry):
+        phase = entry["phase"]
+        phase["seconds"] += monotonic() - entry["resumed_at"][0]
+        phase["cpu_seconds"] += process_time() - entry["resumed_at"][1]
+        if self._profile is not None:
+            entry["peak"] = max(entry["peak"], tracemalloc.get_traced_memory()[1])
+
+    def _take_snapshot(self):
+        started_at = monotonic()
+        snapshot = tracemalloc.take_snapshot()
+        self.overhead_seconds += monotonic() - started_at
+        return snapshot
+
+    def rows(self):
+        total_seconds = monotonic() - self.started_at
+        rows = [[name, phase["calls"], round(phase["seconds"], 3), round(phase["cpu_seconds"], 3),
+                 phase["peak_bytes"] if self._profile is not None else ""]
+                for name, phase in self.phases.items()]
+        if self._profile is not None:
+            rows.append(["(profiler snapshots)", "", round(self.overhead_seconds, 3), "", ""])
+        rows.append(["(outside the phases)", "", round(total_seconds - self.overhead_seconds -
+                                                       sum(phase["seconds"] for phase in self.phases.values()), 3),
+                     "", ""])
+        return rows
+
+    def log_phases(self):
+        for name, phase in self.phases.items():
+            logging.info("Phase {}: {} calls, {:.3f}s, {:.3f}s CPU".format(
+                name, phase["calls"], phase["seconds"], phase["cpu_seconds"]))
+
+    def write(self):
+        """
+        Stops the profilers and writes the cProfile stats to the profile file, readable with pstats or
+        snakeviz, and the phases with their largest allocations and the slowest functions to the profile
+        file + ".txt". The phases are also printed to stderr.
+        """
+        if self._profile is None:
+            return
+        self._profile.disable()
+        table = tabulate.tabulate(self.rows(), ["Phase", "Calls", "Time s", "CPU s", "Peak Bytes"],
+                                  tablefmt="pretty", colalign=["left"] + ["right"] * 4)
+        print("\nPhases:\n{}".format(table), file=sys.stderr)
+        try:
+            self._profile.dump_stats(self.profile_file)
+            with open(self.profile_file + ".txt", "w") as f:
+                f.write("Phases:\n{}\n".format(table))
+                for name, phase in self.phases.items():
+                    before, after = phase["snapshots"] or (None, None)
+                    if after is None:
+                        continue
+                    f.write("\nLargest allocations left by the first {} phase:\n".format(name))
+                    statistics = [statistic for statistic in after.compare_to(before, "lineno")
+                                  if statistic.size_diff > 0 and
+                                  statistic.traceback[0].filename != tracemalloc.__file__]
+                    for statistic in statistics[:PROFILE_TOP_ALLOCATIONS]:
+                        f.write("{:>14,} B {:>+10,} blocks  {}\n".format(
+                            statistic.size_diff, statistic.count_diff, statistic.traceback))
+                f.write("\nSlowest functions of the main thread:\n")
+                stats = pstats.Stats(self._profile, stream=f)
+                stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        except IOError as error:
+            print("Unable to write the profile to {} due to {}".format(self.profile_file, error))
+            return
+        finally:
+            tracemalloc.stop()
+        print("The profile is written to {0} and {0}.txt".format(self.profile_file), file=sys.stderr)
+
+
+# phases of this run, profiled with --profile
+_profiler = PhaseProfiler()
+
+
+def get_profiler():
+    return _profiler
+
+
+class TraceRecorder:
+    """
+    Records the phases of the run, its HTTP requests, the pages fetched concurrently and the waits of bulk
+    updates as Chrome trace events, written to 'file_name' as JSON at exit. The file opens as a timeline with
+    one row per thread in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.started_at = monotonic()
+        self._lock = Lock()
+        self._events = list()
+        self._thread_ids = set()
+
+    def _add(self, event):
+        thread = current_thread()
+        event["pid"] = os.getpid()
+        event["tid"] = thread.ident
+        with self._lock:
+            if thread.ident not in self._thread_ids:
+                self._thread_ids.add(thread.ident)
+                self._events.append({"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": thread.ident,
+                                     "args": {"name": thread.name}})
+            self._events.append(event)
+
+    def _timestamp(self, at):
+        # microseconds since the start of the run
+        return round((at - self.started_at) * 1000000, 1)
+
+    def add_span(self, name, category, started_at, ended_at, args=None):
+        self._add({"name": name, "cat": category, "ph": "X", "ts": self._timestamp(started_at),
+                   "dur": round((ended_at - started_at) * 1000000, 1), "args": args or {}})
+
+    def add_instant(self, name, category, args=None):
+        self._add({"name": name, "cat": category, "ph": "i", "s": "t", "ts": self._timestamp(monotonic()),
+                   "args": args or {}})
+
+    def write(self):
+        with self._lock:
+            events = list(self._events)
+        try:
+            with open(self.file_name, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        except IOError as error:
+            print("Unable to write the trace to {} due to {}".format(self.file_name, error))
+
+
+# the timeline of this run, recorded with --trace-file
+_trace_recorder = None
+
+
+def get_trace_recorder():
+    return _trace_recorder
+
+
+@contextmanager
+def trace_span(name, category, args=None):
+    """
+    Records the time of the block as a span of the trace, when the run is traced.
+    """
+    started_at = monotonic()
+    try:
+        yield
+    finally:
+        if get_trace_recorder() is not None:
+            get_trace_recorder().add_span(name, category, started_at, monotonic(), args)
+
+
+class Cassette:
+    """
+    The requests of a run and their responses, recorded to 'directory' with --record and served back
+    from it with --replay, so a run can be reproduced and profiled without the server.
+    Every interaction is a line of cassette.jsonl, and every response body a file named after its
+    resource type, like workbooks-000012.xml. Credentials in request bodies and the auth token of the
+    sign in response are replaced with REDACTED, and request headers are not recorded at all.
+    Replayed responses are matched by method, path, query and redacted body, with the times in the query
+    left out; repeated requests get the recorded responses in order, then the last one again. They wait
+    for the recorded time multiplied by 'latency_scale'.
+    """
+
+    INDEX_FILE = "cassette.jsonl"
+    REDACTED = "REDACTED"
+    CREDENTIALS_PATTERN = re.compile(r'(<credentials)\b[^>]*?(/?>)')
+    TOKEN_PATTERN = re.compile(r'(<credentials\b[^>]*?\btoken=)"[^"]*"')
+    TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}(:|%3A)\d{2}(:|%3A)\d{2}Z")
+
+    def __init__(self, directory, replaying, latency_scale=1.0):
+        self.directory = directory
+        self.replaying = replaying
+        self.latency_scale = latency_scale
+        self._lock = Lock()
+        self._interactions = defaultdict(list)
+        self._served = defaultdict(int)
+        self._recorded = 0
+
+    @classmethod
+    def record_to(cls, directory):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # a new recording replaces the previous one
+        open(os.path.join(directory, cls.INDEX_FILE), "w").close()
+        return cls(directory, False)
+
+    @classmethod
+    def replay_from(cls, directory, latency_scale=1.0):
+        cassette = cls(directory, True, latency_scale)
+        with open(os.path.join(directory, cls.INDEX_FILE), "r") as f:
+            for line in f:
+                interaction = json.loads(line)
+                cassette._interactions[cls.key(interaction["method"], interaction["url"], interaction["body"])].append(
+                    interaction)
+        return cassette
+
+    @classmethod
+    def key(cls, method, url, body):
+        # filters on times relative to now, like the job history, differ between the recording and the replay
+        return method, cls.TIMESTAMP_PATTERN.sub("{time}", url), body
+
+    @staticmethod
+    def relative_url(url):
+        # the scheme and address are left out, so a cassette replays with any --server
+        parts = urlsplit(url)
+        return parts.path + ("?" + parts.query if parts.query else "")
+
+    @classmethod
+    def redacted_body(cls, body):
+        if body is None:
+            return None
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        return cls.CREDENTIALS_PATTERN.sub(r'\1 name="{0}" password="{0}"\2'.format(cls.REDACTED), body)
+
+    def record(self, request, response, seconds):
+        url = Cassette.relative_url(request.url)
+        content = response.content
+        redacted = "/auth/signin" in url
+        if redacted:
+            content = Cassette.TOKEN_PATTERN.sub(r'\1"{}"'.format(Cassette.REDACTED),
+                                                 content.decode("utf-8")).encode("utf-8")
+        with self._lock:
+            self._recorded += 1
+            file_name = "{}-{:06d}.xml".format(MemoizingSession.resource_type(request.url) or "response",
+                                               self._recorded)
+            with open(os.path.join(self.directory, file_name), "wb") as f:
+                f.write(content)
+            # the body is stored decoded, Content-Length keeps the size received on the wire; that size is not
+            # the one of a redacted body, which is then replayed without Content-Length, like an unknown size
+            headers = {name: response.headers[name] for name in ["Content-Type", "Content-Length"]
+                       if name in response.headers and not (redacted and name == "Content-Length")}
+            interaction = {"method": request.method, "url": url, "body": Cassette.redacted_body(request.body),
+                           "status": response.status_code, "headers": headers, "seconds": round(seconds, 6),
+                           "file": file_name}
+            with open(os.path.join(self.directory, Cassette.INDEX_FILE), "a") as f:
+                f.write(json.dumps(interaction) + "\n")
+
+    def replay(self, request):
+        key = Cassette.key(request.method, Cassette.relative_url(request.url), Cassette.redacted_body(request.body))
+        with self._lock:
+            interactions = self._interactions.get(key)
+            interaction = None
+            if interactions:
+                interaction = interactions[min(self._served[key], len(interactions) - 1)]
+                self._served[key] += 1
+
+        response = requests.models.Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = "utf-8"
+        if interaction is None:
+            error_response = ET.Element("tsResponse", xmlns=xmlns['t'])
+            error = ET.SubElement(error_response, "error", code="404000")
+            ET.SubElement(error, "summary").text = "Not recorded"
+            ET.SubElement(error, "detail").text = "{} {} is not in the cassette {}".format(
+                request.method, Cassette.relative_url(request.url), self.directory)
+            response.status_code = 404
+            response.headers["Content-Type"] = "application/xml"
+            response._content = ET.tostring(error_response)
+            return response
+
+        sleep(interaction["seconds"] * self.latency_scale)
+        response.status_code = interaction["status"]
+        response.headers.update(interaction["headers"])
+        with open(os.path.join(self.directory, interaction["file"]), "rb") as f:
+            response._content = f.read()
+        return response
+
+
+def is_replaying():
+    # a replayed run signs in with a redacted token, which is not saved over the session of real runs
+    cassette = get_http_session().cassette
+    return cassette is not None and cassette.replaying
+
+
+# one keep-alive session for all the requests of the run, so connections (and TLS handshakes) are reused
+_http_session = None
+
+
+def get_http_session(pool_size=None):
+    """
+    Returns the session shared by the sign in and all the TSC requests.
+    'pool_size' is the number of connections kept open to the server, which should be at least
+                the number of requests sent concurrently; by default the current size is kept.
+    """
+    global _http_session
+    if _http_session is None:
+        _http_session = lazy_subclass(MemoizingSession, requests.Session)()
+        _http_session.headers["Accept-Encoding"] = "gzip, deflate"
+        _http_session.headers["Connection"] = "keep-alive"
+        pool_size = pool_size if pool_size is not None else DEFAULT_WORKERS
+
+    if pool_size is not None:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        _http_session.mount("http://", adapter)
+        _http_session.mount("https://", adapter)
+        _http_session.pool_size = pool_size
+    return _http_session
+
+
+def get_all_pages(get_page, request_options=None, workers=None):
+    """
+    Returns all the items of a paged collection, like list(TSC.Pager(...)) but with the largest page size
+    and with the pages after the first one fetched concurrently, in order.
+    'get_page'        an endpoint's get, called with the request options of one page
+    'request_options' filters and sorting of the query, its page number and size are ignored
+    'workers'         pages fetched at the same time, the size of the connection pool by default
+    """
+    def page_options(page_number):
+        options = TSC.RequestOptions(pagenumber=page_number, pagesize=MAX_PAGE_SIZE)
+        if request_options is not None:
+            options.filter.update(request_options.filter)
+            options.sort.update(request_options.sort)
+        return options
+
+    def get_page_number(page_number):
+        # the span of a page holds its request and the parsing of the response
+        with trace_span("page {}".format(page_number), "page"):
+            return get_page(page_options(page_number))
+
+    with get_profiler().phase("catalog fetch"):
+        items, pagination_item = get_page_number(1)
+        # some endpoints are not paged at all
+        if pagination_item.total_available is None or len(items) == 0 or \
+                len(items) >= pagination_item.total_available:
+            return items
+
+        # the server may return fewer items per page than requested
+        page_size = len(items)
+        page_count = (pagination_item.total_available + page_size - 1) // page_size
+        workers = workers if workers is not None else get_http_session().pool_size
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, page_count - 1))) as executor:
+            for page_items, page_pagination_item in executor.map(get_page_number, range(2, page_count + 1)):
+                items.extend(page_items)
+        return items
+
+
+def tableau_tag(name):
+    return "{{{}}}{}".format(xmlns['t'], name)
+
+
+def iterparse_items(content, item_tag):
+    """
+    Yields the pagination element and every 'item_tag' element of a response while it is parsed.
+    The items already read are removed from the tree, so a page is never held in memory as a whole.
+    """
+    pagination_tag = tableau_tag("pagination")
+    parents = list()
+    for event, element in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag == item_tag or element.tag == pagination_tag:
+            yield element
+            if len(parents) > 0:
+                parents[-1].clear()
+
+
+def parse_items(content, item_tag, from_element):
+    """
+    Returns the items of a page of a collection and its pagination, like the from_response of the TSC items.
+    'from_element' builds an item from one 'item_tag' element.
+    """
+    items = list()
+    pagination_item = TSC.PaginationItem()
+    for element in iterparse_items(content, item_tag):
+        if element.tag == item_tag:
+            items.append(from_element(element))
+        else:
+            pagination_item._page_number = int(element.get('pageNumber', '-1'))
+            pagination_item._page_size = int(element.get('pageSize', '-1'))
+            pagination_item._total_available = int(element.get('totalAvailable', '-1'))
+    return items, pagination_item
+
+
+def parse_tableau_datetime(date):
+    return TSC.datetime_helpers.parse_datetime(date)
+
+
+def intern_string(value):
+    # ids, names and statuses repeated across many items are stored once
+    return sys.intern(value) if value is not None else None
+
+
+def workbook_from_element(element):
+    # the attributes read by the commands and the metadata cache; tags and views are skipped
+    project_id = None
+    project_name = None
+    project_element = element.find('t:project', namespaces=xmlns)
+    if project_element is not None:
+        project_id = project_element.get('id')
+        project_name = project_element.get('name')
+
+    owner_element = element.find('t:owner', namespaces=xmlns)
+    owner_id = owner_element.get('id') if owner_element is not None else None
+
+    data_acceleration_config = {'acceleration_enabled': None, 'accelerate_now': None,
+                                'last_updated_at': None, 'acceleration_status': None}
+    data_acceleration_element = element.find('t:dataAccelerationConfig', namespaces=xmlns)
+    if data_acceleration_element is not None:
+        data_acceleration_config = TSC.models.workbook_item.parse_data_acceleration_config(data_acceleration_element)
+
+    return WorkbookRecord(element.get('id'), element.get('name'), element.get('contentUrl'),
+                          parse_tableau_datetime(element.get('updatedAt')),
+                          element.get('showTabs', '').lower() == 'true', project_id, project_name, owner_id,
+                          data_acceleration_config)
+
+
+def task_from_element(element):
+    # only the workbook and the schedule name and next run time are read, the commands use nothing else
+    workbook_element = element.find('t:workbook', namespaces=xmlns)
+    schedule_element = element.find('t:schedule', namespaces=xmlns)
+    return TaskRecord(element.get('id'),
+                      workbook_element.get('id') if workbook_element is not None else None,
+                      schedule_element.get('name') if schedule_element is not None else None,
+                      parse_tableau_datetime(schedule_element.get('nextRunAt'))
+                      if schedule_element is not None else None)
+
+
+def job_with_notes_from_element(element):
+    # BackgroundJobItem does not keep the job notes, so read them from the response next to each job
+    notes = [element.get('notes', '')]
+    notes.extend(notes_element.text or '' for notes_element in element.findall('.//t:notes', namespaces=xmlns))
+    return TSC.BackgroundJobItem._parse_element(element, xmlns), '\n'.join(notes)
+
+
+# the site the session is signed in to, looked up once per server connection
+_current_sites = weakref.WeakKeyDictionary()
+
+
+def get_current_site(server):
+    if server not in _current_sites:
+        _current_sites[server] = server.sites.get_by_id(server.site_id)
+    return _current_sites[server]
 
 
 def cleanStrings(auth_token, site_id, user_id, serverurl, ssl_cert_pem):
@@ -295,7 +1146,7 @@ def need_to_relogin(args, server):
 
     current_site = None
     try:
-        current_site = server.sites.get_by_id(server.site_id)
+        current_site = get_current_site(server)
     except Exception:
         pass
 
@@ -313,7 +1164,10 @@ def need_to_relogin(args, server):
 
 
 def get_authenticated_connection_to_server(args):
-    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+    requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
+    if get_http_session().cassette is not None:
+        # recorded and replayed runs always sign in, so a replay sends the same requests as the recording
+        return sign_in(args)
     server = get_session_connection_to_server()
     current_server_address = server.server_address if server is not None else None
     if need_to_relogin(args, server):
@@ -371,6 +1225,34 @@ def assert_create_schedule(args):
 
 
 def assert_options_valid(args):
+    if args.workers < 1:
+        print("--workers should be at least 1")
+        return False
+
+    if args.max_rps is not None and args.max_rps <= 0:
+        print("--max-rps should be greater than 0")
+        return False
+
+    if args.retries < 0:
+        print("--retries should not be negative")
+        return False
+
+    if args.job_history_days < 0:
+        print("--job-history-days should not be negative")
+        return False
+
+    if args.record is not None and args.replay is not None:
+        print("Do not use --record and --replay at the same time.")
+        return False
+
+    if args.replay_latency < 0:
+        print("--replay-latency should not be negative")
+        return False
+
+    if args.output_file is not None and args.output == 'table':
+        print("--output-file can only be used with --output csv or --output jsonl")
+        return False
+
     if args.logout is not None and (args.server is not None or args.site is not None):
         print("Do not use --logout and --server at the same time.")
         return False
@@ -540,6 +1422,49 @@ def main():
                         choices=[0, 15, 30, 45], help='end time minute: Default=0', type=int, default=0)
     parser.add_argument('--compare', '-cp', required=False, nargs='*',
                         help='display acceleration benefit summary for enabled workbooks')
+    parser.add_argument('--workers', required=False, type=int, default=DEFAULT_WORKERS,
+                        help='maximum number of concurrent requests: Default={}'.format(DEFAULT_WORKERS))
+    parser.add_argument('--max-rps', required=False, type=float,
+                        help='maximum number of update requests sent per second: Default=no limit')
+    parser.add_argument('--retries', required=False, type=int, default=DEFAULT_RETRIES,
+                        help='retries for update requests that fail temporarily: Default={}'.format(DEFAULT_RETRIES))
+    parser.add_argument('--failed-path-list', '-fpl', required=False, metavar="FILE",
+                        help='write the paths of workbooks that could not be added to or removed from a schedule '
+                             'to FILE, to retry them with --path-list')
+    parser.add_argument('--cache', required=False, action='store_true',
+                        help='keep the projects and workbooks of the site in a local cache and only download '
+                             'the ones updated since the previous run (also enabled by ACCELERATE_WORKBOOKS_CACHE=1)')
+    parser.add_argument('--refresh', required=False, action='store_true',
+                        help='download all the projects and workbooks into the local cache again')
+    parser.add_argument('--no-cache', required=False, action='store_true',
+                        help='do not use the local cache, even when ACCELERATE_WORKBOOKS_CACHE is set')
+    parser.add_argument('--output', '-o', required=False, choices=['table', 'csv', 'jsonl'], default='table',
+                        help='format of the reports; csv and jsonl rows are written as they are found, and when '
+                             'they go to the standard output every other message goes to stderr: Default=table')
+    parser.add_argument('--output-file', '-of', required=False, metavar="FILE",
+                        help='write the csv or jsonl reports to FILE instead of the standard output')
+    parser.add_argument('--sort', required=False, action='store_true',
+                        help='sort the csv or jsonl rows like the tables, which waits for all of them')
+    parser.add_argument('--no-pager', required=False, action='store_true',
+                        help='print tables in one piece instead of pausing after every {} rows'.format(PAGE_SIZE))
+    parser.add_argument('--metrics', required=False, nargs='?', const='-', metavar="FILE",
+                        help='print the requests, errors, bytes and latency of every REST API endpoint at exit, '
+                             'or write them to FILE as JSON')
+    parser.add_argument('--profile', required=False, metavar="FILE",
+                        help='profile the run with cProfile and tracemalloc, writing the stats to FILE and the time, '
+                             'CPU and memory of every phase to FILE.txt')
+    parser.add_argument('--trace-file', required=False, metavar="FILE",
+                        help='write a timeline of the phases and HTTP requests of the run to FILE, '
+                             'in the Chrome trace format of chrome://tracing and ui.perfetto.dev')
+    parser.add_argument('--record', required=False, metavar="DIR",
+                        help='record the requests of the run and their responses to DIR, without credentials')
+    parser.add_argument('--replay', required=False, metavar="DIR",
+                        help='answer the requests of the run with the responses recorded in DIR')
+    parser.add_argument('--replay-latency', required=False, type=float, default=1.0, metavar="SCALE",
+                        help='multiplier of the recorded response times waited by --replay, 0 to not wait: Default=1')
+    parser.add_argument('--job-history-days', required=False, type=int, default=JOB_HISTORY_DAYS,
+                        help='days of job history read for --status, older jobs are not shown: '
+                             'Default={}'.format(JOB_HISTORY_DAYS))
 
     args = parser.parse_args()
 
@@ -550,42 +1475,120 @@ def main():
     logging_level = getattr(logging, args.logging_level.upper())
     logging.basicConfig(level=logging_level)
 
+    # without a session to sign out of, --logout does not import the server modules at all
+    if args.logout is not None and not readTokenFromEnv()[0] and not readTokenFromFile()[0]:
+        removeTokenFile()  # in case the auth token expires
+        print("No existing connection to any server.")
+        return
+
+    global _report_writer
+    try:
+        _report_writer = ReportWriter.from_args(args)
+    except IOError as error:
+        print("Unable to open the output file {} due to {}".format(args.output_file, error))
+        return
+    if _report_writer.streaming and _report_writer.file is None:
+        # the report keeps the standard output to itself so it can be parsed, every message goes to stderr
+        sys.stdout = sys.stderr
+
+    global _trace_recorder
+    if args.trace_file is not None:
+        _trace_recorder = TraceRecorder(args.trace_file)
+        atexit.register(_trace_recorder.write)
+
+    global _profiler
+    _profiler = PhaseProfiler(args.profile)
+    _profiler.start()
+    atexit.register(_profiler.write)
+
+    # every parallel stage runs at most args.workers requests at a time
+    session = get_http_session(args.workers)
+    if args.metrics is not None:
+        session.metrics = RequestMetrics()
+        atexit.register(session.metrics.write, args.metrics)
+    try:
+        if args.record is not None:
+            session.cassette = Cassette.record_to(args.record)
+        elif args.replay is not None:
+            session.cassette = Cassette.replay_from(args.replay, args.replay_latency)
+    except (IOError, OSError, ValueError, KeyError) as error:
+        print("Unable to open the cassette {} due to {}".format(args.record or args.replay, error))
+        return
+
     # ignore warnings for missing ssl cert for https connections
-    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+    requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
 
     if args.logout is not None:
         sign_out()
         return
 
-    server = get_authenticated_connection_to_server(args)
+    with get_profiler().phase("authentication"):
+        server = get_authenticated_connection_to_server(args)
 
-    if server is None:
-        return
+        if server is None:
+            return
 
+    responses_received = session.responses_received
+    try:
+        try:
+            run_command(server, args)
+        except TSC.ServerResponseError as error:
+            # a cached session is not validated again, so it can expire between two runs
+            if not str(error.code).startswith('401'):
+                raise
+            removeTokenFile()
+            if session.responses_received - responses_received > 1:
+                # the command already read or changed something, so running it again could repeat its changes
+                print("The session to {} expired while the command ran, please sign in and run it again.".format(
+                    server.server_address))
+                return
+            if args.username is None or args.password is None:
+                print("The session to {} has expired, please sign in again.".format(server.server_address))
+                return
+            # nothing has run yet: sign in again with the given credentials to the same site, and run the command
+            if args.site is None:
+                args.site = get_current_site(server).content_url
+            with get_profiler().phase("authentication"):
+                signed_in_server = sign_in(args, server.server_address)
+            if signed_in_server is None:
+                return
+            server = signed_in_server
+            run_command(server, args)
+    finally:
+        get_report_writer().close()
+        if server is not None:
+            server._session.log_statistics()
+        get_profiler().log_phases()
+
+
+def run_command(server, args):
     # site content url is the TSC term for site id
-    site = server.sites.get_by_id(server.site_id)
-    site_content_url = site.content_url
+    site_content_url = get_current_site(server).content_url
 
-    if args.show_tasks is not None or args.delete_schedule is not None or args.create_schedule is not None or \
-            args.remove_from_schedule is not None or args.add_to_schedule is not None or \
-            args.show_schedules is not None:
-        if not handle_schedule_command(server, args):
-            return
+    if use_metadata_cache(args):
+        open_metadata_cache(server, args.refresh)
 
-    elif args.enable is not None or args.disable is not None:
-        if not handle_enable_disable_command(server, args, site_content_url):
-            return
+    with get_profiler().phase("command"):
+        if args.show_tasks is not None or args.delete_schedule is not None or args.create_schedule is not None or \
+                args.remove_from_schedule is not None or args.add_to_schedule is not None or \
+                args.show_schedules is not None:
+            if not handle_schedule_command(server, args):
+                return
+
+        elif args.enable is not None or args.disable is not None:
+            if not handle_enable_disable_command(server, args, site_content_url):
+                return
 
-    # show enabled sites and workbooks
-    if args.status is not None:
-        show_materialized_views_status(server, args, site_content_url)
+        # show enabled sites and workbooks
+        if args.status is not None:
+            show_materialized_views_status(server, args, site_content_url)
 
-    if args.compare is not None:
-        show_plt_comparisons(server, args)
+        if args.compare is not None:
+            show_plt_comparisons(server, args)
 
 
 def find_enabled_workbooks(server):
-    workbooks = list(TSC.Pager(server.workbooks))
+    workbooks = get_all_workbooks(server)
     project_id_to_project_path = get_project_id_to_project_path_map(server)
     workbook_id_to_workbooks = {}
     for workbook in workbooks:
@@ -613,19 +1616,18 @@ def show_plt_comparisons(server, args):
     for (workbook, path) in workbook_id_to_workbook.values():
         workbook_url_to_workbook[workbook.content_url] = workbook, path
 
-    comparison_records_for_print = list()
-    for comparison_record in comparison_records:
-        splits = comparison_record.sheet_uri.split('/')
-        if splits is not None and len(splits) == 2 and splits[0] in workbook_url_to_workbook:
-            workbook, path = workbook_url_to_workbook[splits[0]]
-            comparison_records_for_print.append(
-                ["{}/{}/{}".format(path, workbook.name, splits[1]),
-                 comparison_record.unaccelerated_session_count,
-                 comparison_record.avg_non_accelerated_plt,
-                 comparison_record.accelerated_session_count,
-                 comparison_record.avg_accelerated_plt])
+    def comparison_records_for_print():
+        for comparison_record in comparison_records:
+            splits = comparison_record.sheet_uri.split('/')
+            if splits is not None and len(splits) == 2 and splits[0] in workbook_url_to_workbook:
+                workbook, path = workbook_url_to_workbook[splits[0]]
+                yield ["{}/{}/{}".format(path, workbook.name, splits[1]),
+                       comparison_record.unaccelerated_session_count,
+                       comparison_record.avg_non_accelerated_plt,
+                       comparison_record.accelerated_session_count,
+                       comparison_record.avg_accelerated_plt]
 
-    print_plt_comparison(comparison_records_for_print)
+    print_plt_comparison(comparison_records_for_print())
 
 
 def find_workbook_id_to_workbook(server, args):
@@ -649,6 +1651,15 @@ def normalize_site_content_url(site_content_url):
 
 
 def print_plt_comparison(plt_comparison_records):
+    if get_report_writer().streaming:
+        rows = ([plt_comparison_record[0], int(plt_comparison_record[1]), float(plt_comparison_record[2]),
+                 int(plt_comparison_record[3]), float(plt_comparison_record[4])]
+                for plt_comparison_record in plt_comparison_records)
+        columns = ['Project/Workbook/Sheet', 'Unaccelerated Session Count', 'Unaccelerated Avg Load (sec)',
+                   'Accelerated Session Count', 'Accelerated Avg Load (sec)']
+        print_table(rows, columns, "Loading Time Comparison")
+        return
+
     rows = list()
 
     session_count_heading = "Session Count "
@@ -674,73 +1685,81 @@ def print_plt_comparison(plt_comparison_records):
     print_table(rows, columns, header, [unaccelerated_heading, accelerated_heading])
 
 
-def print_materialized_views_tasks(server, tasks, workbook_id_to_workbook=None):
+def print_materialized_views_tasks(server, task_index, workbook_id_to_workbook=None):
     local_tz = tz.tzlocal()
 
-    rows = list()
-
     project_id_to_project_path = None
     if workbook_id_to_workbook is None:
+        tasks = task_index.tasks
         project_id_to_project_path = get_project_id_to_project_path_map(server)
-    workbook_id_with_tasks = set()
-    for task in tasks:
-        workbook_id_with_tasks.add(task.target.id)
-        workbook = server.workbooks.get_by_id(task.target.id)
-        if workbook is not None and \
-                (workbook_id_to_workbook is None or workbook.id in workbook_id_to_workbook):
-            if workbook_id_to_workbook is not None:
-                workbook, path = workbook_id_to_workbook[workbook.id]
-            elif project_id_to_project_path is not None:
-                path = project_id_to_project_path[workbook.project_id]
-            else:
-                path = workbook.project_name
-            rows.append(['{}/{}'.format(path, workbook.name),
-                         task.schedule_item.name,
-                         task.schedule_item.next_run_at.astimezone(local_tz)
-                         if task.schedule_item.next_run_at is not None else None])
+        task_workbooks = get_workbooks_by_ids(server, [task.workbook_id for task in tasks])
+    else:
+        tasks = [task for workbook_id in workbook_id_to_workbook
+                 for task in task_index.by_workbook.get(workbook_id, [])]
+        task_workbooks = {workbook_id: workbook for workbook_id, (workbook, path) in workbook_id_to_workbook.items()}
 
+    workbook_id_with_tasks = set(task.workbook_id for task in tasks)
     workbook_id_without_tasks = set(workbook_id_to_workbook.keys()).difference(workbook_id_with_tasks) \
         if workbook_id_to_workbook is not None else set()
 
     workbooks_not_enabled = set()
     for workbook_id in workbook_id_without_tasks:
         workbook, path = workbook_id_to_workbook[workbook_id]
-        if workbook.data_acceleration_config["acceleration_enabled"]:
-            rows.append(['{}/{}'.format(path, workbook.name), '*', ''])
-        else:
+        if not workbook.data_acceleration_config["acceleration_enabled"]:
             workbooks_not_enabled.add(workbook.id)
 
     workbook_id_without_tasks = workbook_id_without_tasks.difference(workbooks_not_enabled)
 
-    rows.sort(key=lambda x: x[0])
-    unique_workbook_paths = set()
-    for row_index in range(len(rows)):
-        if rows[row_index][0] not in unique_workbook_paths:
-            unique_workbook_paths.add(rows[row_index][0])
-        else:
-            rows[row_index][0] = ''
+    def rows():
+        for task in tasks:
+            workbook = task_workbooks.get(task.workbook_id)
+            if workbook is not None:
+                if workbook_id_to_workbook is not None:
+                    workbook, path = workbook_id_to_workbook[workbook.id]
+                elif project_id_to_project_path is not None:
+                    path = project_id_to_project_path[workbook.project_id]
+                else:
+                    path = workbook.project_name
+                yield ['{}/{}'.format(path, workbook.name),
+                       task.schedule_name,
+                       task.next_run_at.astimezone(local_tz)
+                       if task.next_run_at is not None else None]
+
+        for workbook_id in workbook_id_without_tasks:
+            workbook, path = workbook_id_to_workbook[workbook_id]
+            yield ['{}/{}'.format(path, workbook.name), '*', '']
 
     columns = ['Project/Workbook', 'Schedule', 'Next Run At']
     header = "\nScheduled Tasks for Workbook Acceleration"
-    print_table(rows, columns, header)
+    if get_report_writer().streaming:
+        print_table(rows(), columns, header, sort_key=lambda x: x[0])
+        return
+
+    # in a table, the path of a workbook is only shown on its first row
+    table_rows = sorted(rows(), key=lambda x: x[0])
+    unique_workbook_paths = set()
+    for row_index in range(len(table_rows)):
+        if table_rows[row_index][0] not in unique_workbook_paths:
+            unique_workbook_paths.add(table_rows[row_index][0])
+        else:
+            table_rows[row_index][0] = ''
+
+    print_table(table_rows, columns, header)
     if len(workbook_id_without_tasks) > 0:
         print("*The Workbook Acceleration views for these workbooks will be updated when they "
               "are published, or when their extract is refreshed.")
 
 
 def get_workbooks_from_paths(server, args):
-    all_projects = {project.id: project for project in TSC.Pager(server.projects)}
+    project_tree = get_project_tree(server)
     workbook_id_to_workbook = dict()
     workbook_path_mapping = parse_workbook_path(args.path_list)
+    workbook_name_to_workbooks = get_workbooks_by_names(server, workbook_path_mapping.keys())
     for workbook_name, workbook_paths in workbook_path_mapping.items():
-        req_option = TSC.RequestOptions()
-        req_option.filter.add(TSC.Filter(TSC.RequestOptions.Field.Name,
-                                         TSC.RequestOptions.Operator.Equals,
-                                         workbook_name))
-        workbooks = list(TSC.Pager(server.workbooks, req_option))
+        workbooks = workbook_name_to_workbooks[workbook_name]
         all_paths = set(workbook_paths[:])
         for workbook in workbooks:
-            path = find_project_path(all_projects[workbook.project_id], all_projects, "")
+            path = project_tree.path(workbook.project_id)
             if path in workbook_paths:
                 all_paths.remove(path)
                 workbook_id_to_workbook[workbook.id] = workbook, path
@@ -752,19 +1771,22 @@ def get_workbooks_from_paths(server, args):
 
 
 def get_workbook_from_path(server, workbook_path):
-    all_projects = {project.id: project for project in TSC.Pager(server.projects)}
+    project_tree = get_project_tree(server)
     workbook_id_to_workbook = dict()
     workbook_path_list = workbook_path.rstrip().split('/')
     workbook_project = '/'.join(workbook_path_list[:-1])
     workbook_name = workbook_path_list[-1]
 
-    req_option = TSC.RequestOptions()
-    req_option.filter.add(TSC.Filter(TSC.RequestOptions.Field.Name,
-                                     TSC.RequestOptions.Operator.Equals,
-                                     workbook_name))
-    workbooks = list(TSC.Pager(server.workbooks, req_option))
+    if get_metadata_cache(server) is not None:
+        workbooks = get_workbooks_by_names(server, [workbook_name])[workbook_name]
+    else:
+        req_option = TSC.RequestOptions()
+        req_option.filter.add(TSC.Filter(TSC.RequestOptions.Field.Name,
+                                         TSC.RequestOptions.Operator.Equals,
+                                         workbook_name))
+        workbooks = list(TSC.Pager(lambda options: get_workbooks(server, options), req_option))
     for workbook in workbooks:
-        path = find_project_path(all_projects[workbook.project_id], all_projects, "")
+        path = project_tree.path(workbook.project_id)
         if path == workbook_project:
             workbook_id_to_workbook[workbook.id] = workbook, workbook_project
             break
@@ -774,95 +1796,175 @@ def get_workbook_from_path(server, workbook_path):
     return workbook_id_to_workbook
 
 
+def get_workbooks_by_ids(server, workbook_ids):
+    # the workbooks endpoint cannot filter by id, so read the workbook list once
+    # instead of calling get_by_id for every id
+    workbook_ids = set(workbook_ids)
+    if len(workbook_ids) == 0:
+        return dict()
+
+    return {workbook.id: workbook for workbook in get_all_workbooks(server) if workbook.id in workbook_ids}
+
+
 def show_materialized_views_tasks(server, args=None, workbook_id_to_workbook=None):
-    tasks = list(TSC.Pager(lambda options: server.tasks.get(task_type=TSC.TaskItem.Type.DataAcceleration)))
+    task_index = get_task_index(server)
     if workbook_id_to_workbook is None and args is not None:
         workbook_path = find_workbook_path(args)
         if args.path_list is not None:
             workbook_id_to_workbook = get_workbooks_from_paths(server, args)
         elif workbook_path is not None:
             workbook_id_to_workbook = get_workbook_from_path(server, workbook_path)
-    print_materialized_views_tasks(server, tasks, workbook_id_to_workbook)
+    print_materialized_views_tasks(server, task_index, workbook_id_to_workbook)
     return True
 
 
-def find_last_running_job_with_status(server, workbook_id, status):
-    request_options = TSC.RequestOptions()
-    request_options.filter.add(TSC.Filter(
-        TSC.RequestOptions.Field.Notes,
-        TSC.RequestOptions.Operator.Has,
-        "{}: {}".format(workbook_id, status)))
-    request_options.sort.add(TSC.Sort(
-        TSC.RequestOptions.Field.CompletedAt,
-        TSC.RequestOptions.Direction.Desc))
-    request_options.page_size = 1
-    request_options.page_number = 1
-    jobs = server.jobs.get(request_options)[0]
-
-    if jobs is None or len(jobs) == 0:
-        return None
-    else:
-        return jobs[0]
+# the search terms written to the notes of Workbook Acceleration jobs for each acceleration status
+STATUS_TO_SEARCH_TERM = {
+    "accelerated": ["Materialized", "AllMaterializedToExternalCache"],
+    "failed": ["JobFailed"],
+    "notUseful": ["MaterializationNotUseful"]
+}
 
 
-def find_last_running_job(server, workbook):
+class JobHistoryIndex:
+    """
+    The latest job for each (workbook id, search term) found in the notes of the jobs
+    completed in the last 'days' days. The jobs are filtered by the search terms on the server,
+    so a workbook without a job in the index has no job with those terms in the window.
+    """
+    NOTES_PATTERN = re.compile(r"(\S+): (\w+)")
+
+    def __init__(self, search_terms):
+        self.search_terms = set(search_terms)
+        self._latest_jobs = dict()
+
+    def add(self, notes, job):
+        for workbook_id, search_term in JobHistoryIndex.NOTES_PATTERN.findall(notes):
+            # jobs are read newest first, so the first job seen is the latest one
+            self._latest_jobs.setdefault((workbook_id, search_term), job)
+
+    def find(self, workbook_id, search_term):
+        return self._latest_jobs.get((workbook_id, search_term))
+
+    @classmethod
+    def build(cls, server, days, search_terms):
+        with get_profiler().phase("catalog fetch"):
+            job_history = cls(search_terms)
+            completed_after = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+            # the filters of a query are combined with "and", so every search term is its own query
+            for search_term in sorted(job_history.search_terms):
+                request_options = TSC.RequestOptions()
+                request_options.filter.add(TSC.Filter(
+                    TSC.RequestOptions.Field.Notes,
+                    TSC.RequestOptions.Operator.Has,
+                    search_term))
+                request_options.filter.add(TSC.Filter(
+                    TSC.RequestOptions.Field.CompletedAt,
+                    TSC.RequestOptions.Operator.GreaterThanOrEqual,
+                    completed_after))
+                request_options.sort.add(TSC.Sort(
+                    TSC.RequestOptions.Field.CompletedAt,
+                    TSC.RequestOptions.Direction.Desc))
+                for job, notes in get_all_pages(lambda options: get_jobs_with_notes(server, options),
+                                                request_options):
+                    job_history.add(notes, job)
+            return job_history
+
+
+def get_jobs_with_notes(server, request_options):
+    server.assert_at_least_version('3.1')
+    server_response = server.jobs.get_request(server.jobs.baseurl, request_options)
+    return parse_items(server_response.content, tableau_tag("backgroundJob"), job_with_notes_from_element)
+
+
+def find_last_running_job(job_history, workbook):
     if workbook is None:
         return None
 
+    # the index holds every job of the window with the search terms of the status, so a miss is final
     status = workbook.data_acceleration_config['acceleration_status']
+    for status_search_term in STATUS_TO_SEARCH_TERM.get(status, []):
+        last_running_job = job_history.find(workbook.id, status_search_term)
+        if last_running_job is not None:
+            return last_running_job
+    return None
 
-    if status in ["inProgress", "waiting", "unknown"]:
-        return None
 
-    status_to_search_term = {
-        "accelerated": ["Materialized", "AllMaterializedToExternalCache"],
-        "failed": ["JobFailed"],
-        "notUseful": ["MaterializationNotUseful"]
-    }
+def find_last_running_jobs(job_history, enabled_workbooks):
+    return {workbook.id: find_last_running_job(job_history, workbook) for workbook, path in enabled_workbooks}
 
-    if status not in status_to_search_term:
-        return None
 
-    for status_search_term in status_to_search_term[status]:
-        last_running_job = find_last_running_job_with_status(server, workbook.id, status_search_term)
-        if last_running_job is not None:
-            return last_running_job
-    return None
+def write_failed_path_list(file_name, failed_paths):
+    # same format as --path-list, so the file can be passed back in to retry the failed workbooks
+    if file_name is None or len(failed_paths) == 0:
+        return
+    try:
+        with open(file_name, "w") as failed_path_list:
+            for failed_path in failed_paths:
+                failed_path_list.write(failed_path + "\n")
+        print("Paths of the {} failed workbook(s) were written to {}".format(len(failed_paths), file_name))
+    except IOError as error:
+        print("Unable to write the failed workbook paths to {} due to {}".format(file_name, error))
 
 
-def remove_materialized_views_tasks(server, tasks, workbook_id_to_workbook, schedule_name):
+def remove_materialized_views_tasks(server, task_index, workbook_id_to_workbook, schedule_name,
+                                    bulk_executor, failed_path_list=None):
     if workbook_id_to_workbook is None or len(workbook_id_to_workbook) == 0:
         return False
 
-    if tasks is None or len(tasks) == 0:
+    if task_index is None or len(task_index) == 0:
         print("Unable to find any MaterializeViews tasks")
         return False
 
     columns = ['Project/Workbook', 'Removed From Schedule']
     header = "Workbooks removed from schedule"
     rows = list()
+    failed_paths = list()
+
+    attempted_task_ids = set()
 
+    def delete_task(task):
+        retried = task.id in attempted_task_ids
+        attempted_task_ids.add(task.id)
+        try:
+            server.tasks.delete(task.id, task_type=TSC.TaskItem.Type.DataAcceleration)
+        except TSC.ServerResponseError as error:
+            # the attempt before may have deleted the task before it failed
+            if not (retried and str(error.code).startswith('404')):
+                raise
+
+    tasks_to_delete = [task_index.find(workbook_id, schedule_name) for workbook_id in workbook_id_to_workbook]
+    tasks_to_delete = [task for task in tasks_to_delete if task is not None]
     removed_workbook_ids = set()
-    for task in tasks:
-        if task.target.id in workbook_id_to_workbook and task.schedule_item.name == schedule_name:
-            try:
-                server.tasks.delete(task.id, task_type=TSC.TaskItem.Type.DataAcceleration)
-                workbook, path = workbook_id_to_workbook[task.target.id]
-                removed_workbook_ids.add(workbook.id)
-                rows.append(['{}/{}'.format(path, workbook.name), task.schedule_item.name])
-            except ServerResponseError as error:
-                print("{}: {}".format(error.summary, error.detail))
+    results = bulk_executor.run(delete_task, tasks_to_delete, idempotent=False)
+    for task, result, error in results:
+        workbook, path = workbook_id_to_workbook[task.workbook_id]
+        if error is None:
+            task_index.remove(task)
+            removed_workbook_ids.add(workbook.id)
+            rows.append(['{}/{}'.format(path, workbook.name), task.schedule_name])
+        elif isinstance(error, TSC.ServerResponseError):
+            print("{}: {}".format(error.summary, error.detail))
+            failed_paths.append('{}/{}'.format(path, workbook.name))
+        else:
+            print("Unable to remove workbook \"{}/{}\" from schedule due to {}".format(path, workbook.name, error))
+            failed_paths.append('{}/{}'.format(path, workbook.name))
 
     if len(rows) > 0:
         print_table(rows, columns, header)
 
-    if len(rows) < len(workbook_id_to_workbook):
-        no_removed_rows = list()
-        for workbook, path in workbook_id_to_workbook.values():
-            if workbook.id not in removed_workbook_ids:
-                no_removed_rows.append(["{}/{}".format(path, workbook.name)])
+    # the workbooks whose task failed to be deleted are reported above as failures
+    failed_workbook_ids = set(task.workbook_id for task, result, error in results if error is not None)
+    no_removed_rows = list()
+    for workbook, path in workbook_id_to_workbook.values():
+        if workbook.id not in removed_workbook_ids and workbook.id not in failed_workbook_ids:
+            no_removed_rows.append(["{}/{}".format(path, workbook.name)])
+    if len(no_removed_rows) > 0:
         print_table(no_removed_rows, ["Project/Workbook"], "\nWorkbooks not on schedule \"{}\"".format(schedule_name))
 
+    write_failed_path_list(failed_path_list, failed_paths)
+
 
 def find_schedule_name(args):
     if args.create_schedule is not None:
@@ -885,13 +1987,13 @@ def remove_workbook_from_materialized_views(server, args):
         show_materialized_views_tasks(server, args)
         return False
 
-    tasks = list(TSC.Pager(lambda options: server.tasks.get(task_type=TSC.TaskItem.Type.DataAcceleration)))
     workbook_id_to_workbook = None
     if workbook_path is not None:
         workbook_id_to_workbook = get_workbook_from_path(server, workbook_path)
     elif args.path_list is not None:
         workbook_id_to_workbook = get_workbooks_from_paths(server, args)
-    remove_materialized_views_tasks(server, tasks, workbook_id_to_workbook, schedule_name)
+    remove_materialized_views_tasks(server, get_task_index(server), workbook_id_to_workbook, schedule_name,
+                                    BulkExecutor.from_args(args), args.failed_path_list)
     return True
 
 
@@ -899,7 +2001,7 @@ def find_schedule(server, schedule_name):
     if schedule_name is None:
         return None
 
-    schedules = list(TSC.Pager(server.schedules.get))
+    schedules = get_all_pages(server.schedules.get)
     for schedule in schedules:
         if schedule_name == schedule.name:
             return schedule
@@ -918,54 +2020,58 @@ def confirm(message, options):
     return answer
 
 
-def add_to_materialized_views_schedule(server, tasks, schedule, workbook_id_to_workbook):
+def add_to_materialized_views_schedule(server, task_index, schedule, workbook_id_to_workbook,
+                                       bulk_executor, failed_path_list=None):
     if schedule is None or workbook_id_to_workbook is None:
         return
 
-    workbook_id_to_schedules = dict()
-    if tasks is not None:
-        for task in tasks:
-            if task.target.type != 'workbook':
-                continue
-            workbook_id_to_schedules.setdefault(task.target.id, set()).add(task.schedule_item.name)
+    def add_to_schedule(workbook_and_path):
+        workbook, path = workbook_and_path
+        return server.schedules.add_to_schedule(schedule.id, workbook, task_type="dataAcceleration")
 
     rows = list()
     warnings = set()
-    for workbook, path in workbook_id_to_workbook.values():
+    failed_paths = list()
+    for (workbook, path), server_response, error in bulk_executor.run(add_to_schedule, workbook_id_to_workbook.values(),
+                                                                      idempotent=False):
         warnings_error_message = "Unable to add workbook \"{}/{}\" to schedule due to".format(
             path, workbook.name)
 
-        try:
-            server_response = server.schedules.add_to_schedule(schedule.id, workbook, task_type="dataAcceleration")
+        if error is not None:
+            print("{} {}".format(warnings_error_message, describe_error(error)))
+            failed_paths.append("{}/{}".format(path, workbook.name))
+            continue
 
-            # add_to_schedule returns a non-empty list when there was an error or warning coming from the server
-            # when there was a warning, needs to check if the task was created
-            if len(server_response) == 0 or server_response[0].task_created:
-                workbook_id_to_schedules.setdefault(workbook.id, set()).add(schedule.name)
-                rows.append(["{}/{}".format(path, workbook.name),
-                             "\n".join(sorted(workbook_id_to_schedules[workbook.id]))])
+        # add_to_schedule returns a non-empty list when there was an error or warning coming from the server
+        # when there was a warning, needs to check if the task was created
+        if len(server_response) == 0 or server_response[0].task_created:
+            schedule_names = set(task_index.schedule_names(workbook.id))
+            schedule_names.add(schedule.name)
+            rows.append(["{}/{}".format(path, workbook.name), "\n".join(sorted(schedule_names))])
 
-            # Case 1: no warnings or error
-            if len(server_response) == 0:
-                continue
+        # Case 1: no warnings or error
+        if len(server_response) == 0:
+            continue
+
+        if server_response[0].task_created:
+            # Case 2: warnings exist, but the task was created
+            warnings.update(server_response[0].warnings)
+            continue
 
-            if server_response[0].task_created:
-                # Case 2: warnings exist, but the task was created
-                warnings.update(server_response[0].warnings)
-            elif server_response[0].warnings is not None:
-                # Case 3: task was not created, warnings exists
-                for warning in server_response[0].warnings:
-                    warnings.add("{} {}".format(warnings_error_message, warning))
-            elif server_response[0].error is not None:
-                # Case 4: task was created, error occurred
-                warnings.add("{} {}".format(warnings_error_message, server_response[0].error))
-        except ServerResponseError as error:
-            print("{} {}".format(warnings_error_message, error.detail))
+        failed_paths.append("{}/{}".format(path, workbook.name))
+        if server_response[0].warnings is not None:
+            # Case 3: task was not created, warnings exists
+            for warning in server_response[0].warnings:
+                warnings.add("{} {}".format(warnings_error_message, warning))
+        elif server_response[0].error is not None:
+            # Case 4: task was created, error occurred
+            warnings.add("{} {}".format(warnings_error_message, server_response[0].error))
 
     print_messages("Warning", sorted(warnings))
     header = "Workbooks added to schedule"
     columns = ['Project/Workbook', 'Schedules']
     print_table(rows, columns, header)
+    write_failed_path_list(failed_path_list, failed_paths)
 
 
 def is_workbook_enable(workbook):
@@ -985,15 +2091,14 @@ def add_workbooks_to_schedule(server, args):
               'Use a Workbook Acceleration schedule.'.format(schedule_name))
         return False
 
-    tasks = list(TSC.Pager(lambda options: server.tasks.get(task_type=TSC.TaskItem.Type.DataAcceleration)))
-
     workbook_path = find_workbook_path(args)
     workbook_id_to_workbook = None
     if workbook_path is not None:
         workbook_id_to_workbook = get_workbook_from_path(server, workbook_path)
     if args.path_list is not None:
         workbook_id_to_workbook = get_workbooks_from_paths(server, args)
-    add_to_materialized_views_schedule(server, tasks, schedule, workbook_id_to_workbook)
+    add_to_materialized_views_schedule(server, get_task_index(server), schedule, workbook_id_to_workbook,
+                                       BulkExecutor.from_args(args), args.failed_path_list)
     return True
 
 
@@ -1064,7 +2169,7 @@ def delete_materialized_view_schedule(server, args):
         print("Unable to find the schedule name to delete")
         return
 
-    schedules = TSC.Pager(server.schedules)
+    schedules = get_all_pages(server.schedules.get)
     schedule_deleted = False
     for schedule in schedules:
         if schedule.name == args.delete_schedule:
@@ -1080,7 +2185,7 @@ def delete_materialized_view_schedule(server, args):
 
 
 def show_materialized_view_schedules(server):
-    schedules = TSC.Pager(server.schedules)
+    schedules = get_all_pages(server.schedules.get)
 
     local_tz = tz.tzlocal()
     rows = list()
@@ -1190,44 +2295,510 @@ def create_materialized_view_schedule(server, args):
             create_weekly_schedule(server, args)
         else:
             create_monthly_schedule(server, args)
-    except ServerResponseError as error:
+    except TSC.ServerResponseError as error:
         print("{}: {}".format(error.summary, error.detail))
         return False
 
     return True
 
 
-def find_project_path(project, all_projects, path):
-    # project stores the id of it's parent
-    # this method is to run recursively to find the path from root project to given project
-    path = project.name if len(path) == 0 else project.name + '/' + path
+class ProjectRecord:
+    """
+    The attributes of a project the commands read, in place of a TSC ProjectItem.
+    """
+    __slots__ = ("id", "name", "parent_id")
+
+    def __init__(self, id_, name, parent_id):
+        self.id = intern_string(id_)
+        self.name = name
+        self.parent_id = intern_string(parent_id)
+
+
+class WorkbookRecord:
+    """
+    The attributes of a workbook the commands read, in place of a TSC WorkbookItem, which also keeps
+    tags, views, connections and a dict per instance. The Workbook Acceleration settings are kept as
+    attributes and returned as the data_acceleration_config dict of TSC.
+    """
+    __slots__ = ("id", "name", "content_url", "updated_at", "show_tabs", "project_id", "project_name", "owner_id",
+                 "acceleration_enabled", "accelerate_now", "last_updated_at", "acceleration_status")
+
+    def __init__(self, id_, name, content_url, updated_at, show_tabs, project_id, project_name, owner_id,
+                 data_acceleration_config):
+        self.id = id_
+        self.name = name
+        self.content_url = content_url
+        self.updated_at = updated_at
+        self.show_tabs = show_tabs
+        self.project_id = intern_string(project_id)
+        self.project_name = intern_string(project_name)
+        self.owner_id = intern_string(owner_id)
+        self.data_acceleration_config = data_acceleration_config
+
+    @property
+    def data_acceleration_config(self):
+        return {'acceleration_enabled': self.acceleration_enabled, 'accelerate_now': self.accelerate_now,
+                'last_updated_at': self.last_updated_at, 'acceleration_status': self.acceleration_status}
+
+    @data_acceleration_config.setter
+    def data_acceleration_config(self, data_acceleration_config):
+        self.acceleration_enabled = data_acceleration_config.get('acceleration_enabled')
+        self.accelerate_now = data_acceleration_config.get('accelerate_now')
+        self.last_updated_at = data_acceleration_config.get('last_updated_at')
+        self.acceleration_status = intern_string(data_acceleration_config.get('acceleration_status'))
+
+    def to_workbook_item(self):
+        workbook_item = TSC.WorkbookItem(self.project_id, self.name, self.show_tabs)
+        workbook_item._set_values(self.id, None, self.content_url, None, None, None, self.updated_at, None,
+                                  None, None, self.project_name, self.owner_id, None, None,
+                                  self.data_acceleration_config)
+        return workbook_item
+
+
+class TaskRecord:
+    """
+    A Workbook Acceleration task: the workbook it updates and the name and next run time of its schedule.
+    """
+    __slots__ = ("id", "workbook_id", "schedule_name", "next_run_at")
 
-    if project.parent_id is None:
+    def __init__(self, id_, workbook_id, schedule_name, next_run_at):
+        self.id = id_
+        self.workbook_id = intern_string(workbook_id)
+        self.schedule_name = intern_string(schedule_name)
+        self.next_run_at = next_run_at
+
+
+class ProjectTree:
+    """
+    All the projects of the site, indexed by id, by full path and by parent id.
+    Full paths ("parent/child/grandchild") are resolved iteratively and memoized,
+    so every ancestor chain is walked only once however many workbooks share it.
+    """
+
+    def __init__(self, projects):
+        self.projects = dict()
+        self.children = defaultdict(list)
+        for project in projects:
+            project = ProjectRecord(project.id, project.name, project.parent_id)
+            self.projects[project.id] = project
+            self.children[project.parent_id].append(project)
+        self._paths = dict()
+        self._path_to_project = None
+
+    @classmethod
+    def from_server(cls, server):
+        metadata_cache = get_metadata_cache(server)
+        if metadata_cache is not None:
+            return cls(metadata_cache.projects())
+        return cls(get_all_pages(server.projects.get))
+
+    def path(self, project_id):
+        # project stores the id of it's parent, walk up until a project with a known path
+        # (or the root) and then memoize the paths on the way back down
+        unresolved = list()
+        current_id = project_id
+        while current_id is not None and current_id not in self._paths:
+            unresolved.append(current_id)
+            current_id = self.projects[current_id].parent_id
+
+        path = self._paths[current_id] if current_id is not None else None
+        for unresolved_id in reversed(unresolved):
+            name = self.projects[unresolved_id].name
+            path = name if path is None else path + '/' + name
+            self._paths[unresolved_id] = path
         return path
-    else:
-        return find_project_path(all_projects[project.parent_id], all_projects, path)
 
+    def subtree(self, project):
+        # depth-first walk over the children index, O(number of projects in the subtree)
+        projects = list()
+        pending = [project]
+        while len(pending) > 0:
+            current = pending.pop()
+            projects.append(current)
+            pending.extend(reversed(self.children[current.id]))
+        return projects
 
-def get_project_id_to_project_path_map(server, projects=None):
-    # most likely user won't have too many projects so we store them in a dict to search
-    all_projects = {project.id: project for project in TSC.Pager(server.projects)}
+    def project_by_path(self, path):
+        if self._path_to_project is None:
+            self._path_to_project = {self.path(project_id): project for project_id, project in self.projects.items()}
+        return self._path_to_project.get(path)
 
-    if projects is None:
-        projects = all_projects.values()
 
-    result = dict()
-    for project in projects:
-        result[project.id] = find_project_path(project, all_projects, "")
-    return result
+# the project tree does not change while the script runs, so it is fetched once per server connection
+_project_trees = weakref.WeakKeyDictionary()
+
+
+def get_project_tree(server):
+    if server not in _project_trees:
+        with get_profiler().phase("project paths"):
+            _project_trees[server] = ProjectTree.from_server(server)
+    return _project_trees[server]
+
+
+class TaskIndex:
+    """
+    All the Workbook Acceleration tasks of the site, indexed by workbook id, by schedule name
+    and by (workbook id, schedule name), so schedule membership checks do not scan the task list.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = list()
+        self.by_workbook = defaultdict(list)
+        self.by_schedule = defaultdict(list)
+        self.by_workbook_and_schedule = dict()
+        for task in tasks:
+            self.add(task)
+
+    @classmethod
+    def from_server(cls, server):
+        server.assert_at_least_version("3.8")
+        url = "{}/{}".format(server.tasks.baseurl, TSC.TaskItem.Type.DataAcceleration)
+        return cls(get_all_pages(lambda options: parse_items(server.tasks.get_request(url, options).content,
+                                                             tableau_tag(TSC.TaskItem.Type.DataAcceleration),
+                                                             task_from_element)))
+
+    def add(self, task):
+        self.tasks.append(task)
+        self.by_workbook[task.workbook_id].append(task)
+        self.by_schedule[task.schedule_name].append(task)
+        self.by_workbook_and_schedule[(task.workbook_id, task.schedule_name)] = task
+
+    def remove(self, task):
+        self.tasks.remove(task)
+        self.by_workbook[task.workbook_id].remove(task)
+        self.by_schedule[task.schedule_name].remove(task)
+        self.by_workbook_and_schedule.pop((task.workbook_id, task.schedule_name), None)
+
+    def find(self, workbook_id, schedule_name):
+        return self.by_workbook_and_schedule.get((workbook_id, schedule_name))
+
+    def schedule_names(self, workbook_id):
+        return [task.schedule_name for task in self.by_workbook.get(workbook_id, [])]
+
+    def __len__(self):
+        return len(self.tasks)
+
 
+def project_to_record(project):
+    return {"id": project.id, "name": project.name, "parent_id": project.parent_id}
 
-def get_project_path_to_project_map(server, projects):
-    # most likely user won't have too many projects so we store them in a dict to search
-    all_projects = {project.id: project for project in TSC.Pager(server.projects)}
+
+def record_to_project(record):
+    return ProjectRecord(record["id"], record["name"], record["parent_id"])
+
+
+def data_acceleration_config_to_record(data_acceleration_config):
+    data_acceleration_config = dict(data_acceleration_config)
+    if data_acceleration_config.get("last_updated_at") is not None:
+        data_acceleration_config["last_updated_at"] = data_acceleration_config["last_updated_at"].isoformat()
+    return data_acceleration_config
+
+
+def workbook_to_record(workbook):
+    data_acceleration_config = data_acceleration_config_to_record(workbook.data_acceleration_config)
+    return {"id": workbook.id, "name": workbook.name, "content_url": workbook.content_url,
+            "updated_at": workbook.updated_at.isoformat() if workbook.updated_at is not None else None,
+            "show_tabs": workbook.show_tabs, "project_id": workbook.project_id,
+            "project_name": workbook.project_name, "owner_id": workbook.owner_id,
+            "data_acceleration_config": data_acceleration_config}
+
+
+def record_to_workbook(record):
+    data_acceleration_config = record["data_acceleration_config"]
+    if data_acceleration_config.get("last_updated_at") is not None:
+        data_acceleration_config["last_updated_at"] = dateutil_parser.parse(
+            data_acceleration_config["last_updated_at"])
+    return WorkbookRecord(record["id"], record["name"], record["content_url"],
+                          dateutil_parser.parse(record["updated_at"])
+                          if record["updated_at"] is not None else None,
+                          record["show_tabs"], record["project_id"], record["project_name"], record["owner_id"],
+                          data_acceleration_config)
+
+
+class MetadataCache:
+    """
+    The projects and workbooks of one site, kept in a SQLite database under the user's cache directory.
+    After the first full download, every sync lists the ids of the items with only LISTING_FIELDS, deletes
+    the cached items the server no longer lists, and downloads the items updated since the previous sync.
+    The acceleration settings of a workbook change without updating it, so the listed ones replace the cached ones.
+    Servers that do not support the fields parameter get a full download every time.
+    """
+
+    # the collections, how to read them, and the element and fields of their listing
+    COLLECTIONS = [
+        ("projects", lambda server: server.projects.get, lambda server: server.projects, "project", ["id"],
+         project_to_record, record_to_project),
+        ("workbooks", lambda server: lambda options: get_workbooks(server, options),
+         lambda server: server.workbooks, "workbook", ["id", "dataAccelerationConfig"],
+         workbook_to_record, record_to_workbook),
+    ]
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS items "
+                                "(collection TEXT, id TEXT, record TEXT, PRIMARY KEY (collection, id))")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS syncs (collection TEXT PRIMARY KEY, synced_at TEXT)")
+        self.connection.commit()
+
+    @staticmethod
+    def directory():
+        if os.name == "nt":
+            base_directory = os.getenv("LOCALAPPDATA", os.path.expanduser("~"))
+        else:
+            base_directory = os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+        return os.path.join(base_directory, "tableau-data-acceleration-client")
+
+    @classmethod
+    def open(cls, server):
+        directory = cls.directory()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        server_and_site = "{} {}".format(server.server_address, server.site_id)
+        file_name = "{}.sqlite".format(hashlib.sha256(server_and_site.encode("utf-8")).hexdigest()[:32])
+        return cls(os.path.join(directory, file_name))
+
+    def sync(self, server, refresh=False):
+        for collection, get_page, endpoint, item_tag, fields, to_record, from_record in MetadataCache.COLLECTIONS:
+            started_at = datetime.utcnow()
+            synced_at = self.connection.execute("SELECT synced_at FROM syncs WHERE collection = ?",
+                                                (collection,)).fetchone()
+            listing = None
+            if synced_at is not None and not refresh and _fields_supported.get(server, True):
+                listing = list_items(server, endpoint(server), item_tag, fields)
+            if listing is None or not self._sync_updates(collection, get_page(server), listing, synced_at[0],
+                                                         to_record):
+                items = get_all_pages(get_page(server))
+                self.connection.execute("DELETE FROM items WHERE collection = ?", (collection,))
+                self._put(collection, items, to_record)
+            self._set_synced_at(collection, started_at)
+
+    def _sync_updates(self, collection, get_page, listing, synced_at, to_record):
+        """
+        Brings the cache up to date with 'listing', the ids of the items on the server and their acceleration
+        settings. Returns False when the server lists items the cache does not have, which were not updated
+        since they were added, and the whole collection has to be downloaded.
+        """
+        deleted_ids = self.ids(collection) - set(listing)
+        self.connection.executemany("DELETE FROM items WHERE collection = ? AND id = ?",
+                                    [(collection, item_id) for item_id in deleted_ids])
+
+        updated_after = datetime.strptime(synced_at, "%Y-%m-%dT%H:%M:%SZ") - CACHE_SYNC_OVERLAP
+        request_options = TSC.RequestOptions(pagesize=MAX_PAGE_SIZE)
+        request_options.filter.add(TSC.Filter(TSC.RequestOptions.Field.UpdatedAt,
+                                              TSC.RequestOptions.Operator.GreaterThanOrEqual,
+                                              updated_after.strftime("%Y-%m-%dT%H:%M:%SZ")))
+        updated_items = list(TSC.Pager(get_page, request_options))
+        self._put(collection, updated_items, to_record)
+
+        updated_ids = set(item.id for item in updated_items)
+        changed_records = list()
+        for item_id, record in self.connection.execute("SELECT id, record FROM items WHERE collection = ?",
+                                                       (collection,)):
+            data_acceleration_config = listing.get(item_id)
+            if data_acceleration_config is None or item_id in updated_ids:
+                continue
+            record = json.loads(record)
+            data_acceleration_config = data_acceleration_config_to_record(data_acceleration_config)
+            if record.get("data_acceleration_config") != data_acceleration_config:
+                record["data_acceleration_config"] = data_acceleration_config
+                changed_records.append((json.dumps(record), collection, item_id))
+        self.connection.executemany("UPDATE items SET record = ? WHERE collection = ? AND id = ?", changed_records)
+
+        if set(listing) != self.ids(collection):
+            logging.info("The cached {} are missing some items, downloading all of them".format(collection))
+            return False
+        logging.info("Updated {} and deleted {} cached {}".format(len(updated_items), len(deleted_ids), collection))
+        if len(changed_records) > 0:
+            logging.info("The acceleration settings of {} cached {} changed".format(len(changed_records), collection))
+        return True
+
+    def _put(self, collection, items, to_record):
+        self.connection.executemany("INSERT OR REPLACE INTO items (collection, id, record) VALUES (?, ?, ?)",
+                                    [(collection, item.id, json.dumps(to_record(item))) for item in items])
+
+    def _set_synced_at(self, collection, synced_at):
+        self.connection.execute("INSERT OR REPLACE INTO syncs (collection, synced_at) VALUES (?, ?)",
+                                (collection, synced_at.strftime("%Y-%m-%dT%H:%M:%SZ")))
+        self.connection.commit()
+
+    def _get(self, collection, from_record):
+        rows = self.connection.execute("SELECT record FROM items WHERE collection = ? ORDER BY rowid",
+                                       (collection,))
+        return [from_record(json.loads(record)) for record, in rows]
+
+    def ids(self, collection):
+        return set(item_id for item_id, in self.connection.execute("SELECT id FROM items WHERE collection = ?",
+                                                                    (collection,)))
+
+    def projects(self):
+        return self._get("projects", record_to_project)
+
+    def workbooks(self):
+        return self._get("workbooks", record_to_workbook)
+
+    def put_workbooks(self, workbooks):
+        self._put("workbooks", workbooks, workbook_to_record)
+        self.connection.commit()
+
+
+# the metadata cache opened for a server connection, when the cache is enabled
+_metadata_caches = weakref.WeakKeyDictionary()
+
+
+def use_metadata_cache(args):
+    if args.no_cache:
+        return False
+    return args.cache or args.refresh or os.getenv("ACCELERATE_WORKBOOKS_CACHE") == "1"
+
+
+def open_metadata_cache(server, refresh=False):
+    # the cache is synced when it is first read, so commands that do not need it do not send any request for it
+    _metadata_caches[server] = None, refresh
+
+
+def get_metadata_cache(server):
+    if server not in _metadata_caches:
+        return None
+
+    metadata_cache, refresh = _metadata_caches[server]
+    if metadata_cache is None:
+        try:
+            with get_profiler().phase("catalog fetch"):
+                metadata_cache = MetadataCache.open(server)
+                metadata_cache.sync(server, refresh)
+            _metadata_caches[server] = metadata_cache, refresh
+        except (sqlite3.Error, OSError, TSC.ServerResponseError) as error:
+            print("Unable to use the local cache due to {}".format(error))
+            del _metadata_caches[server]
+    return metadata_cache if server in _metadata_caches else None
+
+
+class ProjectedRequestOptions:
+    """
+    Mixed into TSC.RequestOptions by get_workbooks, request options that also ask the server
+    to return only 'fields' of every item.
+    """
+
+    def __init__(self, fields, request_options=None):
+        super(ProjectedRequestOptions, self).__init__(
+            request_options.pagenumber if request_options is not None else 1,
+            request_options.pagesize if request_options is not None else 100)
+        if request_options is not None:
+            self.filter.update(request_options.filter)
+            self.sort.update(request_options.sort)
+        self.fields = fields
+
+    def get_query_params(self):
+        params = super(ProjectedRequestOptions, self).get_query_params()
+        params["fields"] = ",".join(self.fields)
+        return params
+
+
+# whether a server returns only the fields asked for, False once it rejected the fields parameter
+# or left out dataAccelerationConfig; the first page of workbooks decides it
+_fields_supported = weakref.WeakKeyDictionary()
+
+
+def read_workbooks(server, request_options):
+    server_response = server.workbooks.get_request(server.workbooks.baseurl, request_options)
+    return parse_items(server_response.content, tableau_tag("workbook"), workbook_from_element)
+
+
+def get_workbooks(server, request_options=None):
+    """
+    Same as server.workbooks.get, but asks only for WORKBOOK_FIELDS when the server supports it
+    and reads only the attributes the commands use from the responses.
+    """
+    if _fields_supported.get(server, True):
+        try:
+            workbooks, pagination_item = read_workbooks(server, lazy_subclass(
+                ProjectedRequestOptions, TSC.RequestOptions)(WORKBOOK_FIELDS, request_options))
+        except TSC.ServerResponseError as error:
+            if not str(error.code).startswith("400"):
+                raise
+            # when the query fails without the fields too, the error is about something else
+            workbooks = read_workbooks(server, request_options)
+            logging.info("The fields parameter was rejected ({}: {}), "
+                         "requesting all the workbook attributes".format(error.summary, error.detail))
+            _fields_supported[server] = False
+            return workbooks
+
+        if server in _fields_supported or len(workbooks) == 0:
+            return workbooks, pagination_item
+        # a server may leave out the fields it does not know instead of rejecting them,
+        # and every workbook would then look not enabled
+        _fields_supported[server] = any(workbook.data_acceleration_config['acceleration_enabled'] is not None
+                                        for workbook in workbooks)
+        if _fields_supported[server]:
+            return workbooks, pagination_item
+        logging.info("The fields parameter left out dataAccelerationConfig, requesting all the workbook attributes")
+    return read_workbooks(server, request_options)
+
+
+def listed_item_from_element(element):
+    # the acceleration settings of a workbook, None for the items that have none
+    data_acceleration_element = element.find('t:dataAccelerationConfig', namespaces=xmlns)
+    data_acceleration_config = TSC.models.workbook_item.parse_data_acceleration_config(data_acceleration_element) \
+        if data_acceleration_element is not None else None
+    return element.get('id'), data_acceleration_config
+
+
+def list_items(server, endpoint, item_tag, fields):
+    """
+    Returns the id of every item of an endpoint mapped to its acceleration settings, asking the server only
+    for 'fields', or None when the server does not return only these fields.
+    """
+    def list_page(options):
+        server_response = endpoint.get_request(endpoint.baseurl, lazy_subclass(
+            ProjectedRequestOptions, TSC.RequestOptions)(fields, options))
+        return parse_items(server_response.content, tableau_tag(item_tag), listed_item_from_element)
+
+    try:
+        listing = dict(get_all_pages(list_page))
+    except TSC.ServerResponseError as error:
+        if not str(error.code).startswith("400"):
+            raise
+        logging.info("The fields parameter was rejected ({}: {}), downloading all the {}s".format(
+            error.summary, error.detail, item_tag))
+        _fields_supported[server] = False
+        return None
+
+    if "dataAccelerationConfig" in fields and len(listing) > 0 and \
+            all(data_acceleration_config is None for data_acceleration_config in listing.values()):
+        logging.info("The fields parameter left out dataAccelerationConfig, downloading all the {}s".format(item_tag))
+        _fields_supported[server] = False
+        return None
+    return listing
+
+
+def get_all_workbooks(server):
+    metadata_cache = get_metadata_cache(server)
+    if metadata_cache is not None:
+        return metadata_cache.workbooks()
+    return get_all_pages(lambda options: get_workbooks(server, options))
+
+
+# tasks only change through this script while it runs, which keeps the index up to date
+_task_indexes = weakref.WeakKeyDictionary()
+
+
+def get_task_index(server):
+    if server not in _task_indexes:
+        _task_indexes[server] = TaskIndex.from_server(server)
+    return _task_indexes[server]
+
+
+def get_project_id_to_project_path_map(server, projects=None):
+    project_tree = get_project_tree(server)
+
+    if projects is None:
+        projects = project_tree.projects.values()
 
     result = dict()
-    for project in projects:
-        result[find_project_path(project, all_projects, "")] = project
+    with get_profiler().phase("project paths"):
+        for project in projects:
+            result[project.id] = project_tree.path(project.id)
     return result
 
 
@@ -1256,21 +2827,28 @@ def print_acceleration_enabled_workbooks(server, args, site):
     workbooks = list()
     project_id_to_project_path = dict()
     project_id_to_project_path.update(get_project_id_to_project_path_map(server))
-    workbooks.extend(list(TSC.Pager(server.workbooks)))
+    workbooks.extend(get_all_workbooks(server))
 
-    rows = list()
     enabled_workbooks = list()
-    local_tz = tz.tzlocal()
     for workbook in workbooks:
         if (workbook_id_to_workbook_from_args is None or workbook.id in workbook_id_to_workbook_from_args) and \
                 workbook.data_acceleration_config['acceleration_enabled']:
-            project_path = project_id_to_project_path[workbook.project_id]
-            enabled_workbooks.append((workbook, project_path))
+            enabled_workbooks.append((workbook, project_id_to_project_path[workbook.project_id]))
+
+    # only the jobs of the statuses shown are read, none when no workbook has one of them
+    search_terms = set()
+    for workbook, path in enabled_workbooks:
+        search_terms.update(STATUS_TO_SEARCH_TERM.get(workbook.data_acceleration_config['acceleration_status'], []))
+    job_history = JobHistoryIndex.build(server, args.job_history_days, search_terms)
+    workbook_id_to_last_running_job = find_last_running_jobs(job_history, enabled_workbooks)
 
+    def rows():
+        local_tz = tz.tzlocal()
+        for workbook, project_path in enabled_workbooks:
             last_updated_at = workbook.data_acceleration_config['last_updated_at'].astimezone(local_tz) \
                 if workbook.data_acceleration_config['last_updated_at'] is not None else None
 
-            last_running_job = find_last_running_job(server, workbook)
+            last_running_job = workbook_id_to_last_running_job.get(workbook.id)
 
             last_updated_at = last_running_job.ended_at \
                 if last_updated_at is None and last_running_job is not None else last_updated_at
@@ -1279,19 +2857,18 @@ def print_acceleration_enabled_workbooks(server, args, site):
                 if last_running_job is not None and last_running_job.started_at is not None \
                    and last_running_job.ended_at is not None else None
 
-            rows.append([
+            yield [
                 normalize_site_content_url(site), '{}/{}'.format(project_path, workbook.name),
                 workbook.data_acceleration_config['acceleration_status'],
                 last_updated_at,
                 last_running_time
-            ])
+            ]
 
-    rows.sort(key=lambda x: x[2])
     header = "\nWorkbook Acceleration is enabled for the following workbooks"
     columns = ["Site", "Project/Workbook", "Status",
                "Last Updated", "Task Running Time (Secs)"]
-    print_table(rows, columns, header,
-                ["Task Running Time (Secs)"])
+    print_table(rows(), columns, header,
+                ["Task Running Time (Secs)"], sort_key=lambda x: x[2])
 
     return enabled_workbooks
 
@@ -1309,35 +2886,114 @@ def update_project_by_path(server, args, data_acceleration_config, site_content_
     if args.project_path is None:
         print("Use --project_path <project path> to specify the path of the project")
         return False
-    project_name = args.project_path.split('/')[-1]
 
     if not assert_site_enabled_for_materialized_views(server, site_content_url):
         return False
-    projects = [project for project in TSC.Pager(server.projects) if project.name == project_name]
-    if not assert_project_valid(args.project_path, projects):
+    project = get_project_tree(server).project_by_path(args.project_path)
+    if not assert_project_valid(args.project_path, [project] if project is not None else []):
         return False
 
-    possible_paths = get_project_path_to_project_map(server, projects)
-    update_project(possible_paths[args.project_path], server, data_acceleration_config)
+    update_project(project, server, data_acceleration_config, BulkExecutor.from_args(args))
     return True
 
 
-def update_project(project, server, data_acceleration_config):
-    all_projects = list(TSC.Pager(server.projects))
-    project_ids = find_project_ids_to_update(all_projects, project)
-    for workbook in TSC.Pager(server.workbooks):
-        if workbook.project_id in project_ids:
-            workbook.data_acceleration_config = data_acceleration_config
-            update_workbook_internal(server, workbook)
+def update_project(project, server, data_acceleration_config, bulk_executor):
+    project_tree = get_project_tree(server)
+    project_ids = find_project_ids_to_update(project_tree, project)
+    workbooks_to_update = [(workbook, project_tree.path(workbook.project_id))
+                           for workbook in get_workbooks_in_projects(server, project_tree, project_ids)]
+    update_workbooks_in_bulk(server, bulk_executor, workbooks_to_update, data_acceleration_config)
 
     print("Updated Workbook Acceleration settings for project: {}".format(project.name))
     print('\n')
 
 
-def find_project_ids_to_update(all_projects, project):
-    projects_to_update = []
-    find_projects_to_update(project, all_projects, projects_to_update)
-    return set([project_to_update.id for project_to_update in projects_to_update])
+def get_workbooks_in_projects(server, project_tree, project_ids):
+    if get_metadata_cache(server) is not None:
+        return [workbook for workbook in get_all_workbooks(server) if workbook.project_id in project_ids]
+
+    project_names = set(project_tree.projects[project_id].name for project_id in project_ids)
+
+    if len(project_ids) > FULL_SCAN_PROJECT_RATIO * len(project_tree.projects):
+        print("Finding workbooks by scanning all the workbooks on the site")
+        return [workbook for workbook in get_all_workbooks(server) if workbook.project_id in project_ids]
+
+    print("Finding workbooks in {} project(s) by project name".format(len(project_ids)))
+    try:
+        workbooks = get_workbooks_by_field_values(server, TSC.RequestOptions.Field.ProjectName,
+                                                  sorted(project_names))
+    except TSC.ServerResponseError as error:
+        print("Unable to filter workbooks by project name due to {}: {}. "
+              "Scanning all the workbooks on the site instead".format(error.summary, error.detail))
+        return [workbook for workbook in get_all_workbooks(server) if workbook.project_id in project_ids]
+
+    # project names are only unique among siblings, so keep the workbooks of the subtree only
+    return [workbook for workbook in workbooks if workbook.project_id in project_ids]
+
+
+def get_workbooks_by_names(server, workbook_names):
+    workbook_name_to_workbooks = defaultdict(list)
+    if get_metadata_cache(server) is not None:
+        workbook_names = set(workbook_names)
+        workbooks = [workbook for workbook in get_all_workbooks(server) if workbook.name in workbook_names]
+    else:
+        workbooks = get_workbooks_by_field_values(server, TSC.RequestOptions.Field.Name, sorted(workbook_names))
+    for workbook in workbooks:
+        workbook_name_to_workbooks[workbook.name].append(workbook)
+    return workbook_name_to_workbooks
+
+
+def get_workbooks_by_field_values(server, field, values):
+    # values are looked up a chunk at a time with an 'in' filter; values that cannot be written
+    # in an 'in' list, and every value of a chunk the server rejects, are looked up one by one
+    workbooks = list()
+    in_operator_supported = True
+    listable_values = [value for value in values if not (',' in value or '[' in value or ']' in value)]
+    single_values = [value for value in values if ',' in value or '[' in value or ']' in value]
+
+    for values_chunk in chunk_filter_values(listable_values):
+        if in_operator_supported:
+            req_option = TSC.RequestOptions(pagesize=MAX_PAGE_SIZE)
+            req_option.filter.add(TSC.Filter(field, TSC.RequestOptions.Operator.In, in_filter_value(values_chunk)))
+            try:
+                workbooks.extend(TSC.Pager(lambda options: get_workbooks(server, options), req_option))
+                continue
+            except TSC.ServerResponseError as error:
+                logging.info("The 'in' filter operator was rejected ({}: {}), "
+                             "filtering by one value at a time".format(error.summary, error.detail))
+                in_operator_supported = False
+        single_values.extend(values_chunk)
+
+    for value in single_values:
+        req_option = TSC.RequestOptions()
+        req_option.filter.add(TSC.Filter(field, TSC.RequestOptions.Operator.Equals, value))
+        workbooks.extend(TSC.Pager(lambda options: get_workbooks(server, options), req_option))
+    return workbooks
+
+
+def in_filter_value(values):
+    # TSC.Filter formats list values without spaces, so the 'in' list is passed as a string
+    return "[{}]".format(",".join(values))
+
+
+def chunk_filter_values(values, max_length=MAX_IN_FILTER_LENGTH):
+    chunk = list()
+    chunk_length = 0
+    for value in values:
+        value_length = len(quote(value)) + len(quote(','))
+        if len(chunk) > 0 and chunk_length + value_length > max_length:
+            yield chunk
+            chunk = list()
+            chunk_length = 0
+        chunk.append(value)
+        chunk_length += value_length
+    if len(chunk) > 0:
+        yield chunk
+
+
+def find_project_ids_to_update(project_tree, project):
+    # all the sub-projects are updated together with the project
+    return set([project_to_update.id for project_to_update in project_tree.subtree(project)])
 
 
 def parse_workbook_path(file_path):
@@ -1351,47 +3007,133 @@ def parse_workbook_path(file_path):
     return workbook_path_mapping
 
 
+class TokenBucket:
+    """
+    Allows on average 'rate' acquisitions per second, with bursts of up to 'capacity'.
+    acquire() blocks the calling thread until a token is available.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+
+
+class BulkExecutor:
+    """
+    Runs a function that sends one request per item on a bounded thread pool,
+    rate limited to 'max_rps' requests per second and retried on transient errors.
+    run() returns (item, result, error) for every item, in the order of the items.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_rps=None, retries=DEFAULT_RETRIES):
+        self.workers = workers
+        self.retries = retries
+        self._token_bucket = TokenBucket(max_rps) if max_rps is not None else None
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.workers, args.max_rps, args.retries)
+
+    @staticmethod
+    def is_transient(error, idempotent=True):
+        # 429 Too Many Requests and 503 Service Unavailable are answered before the request is processed
+        if isinstance(error, (TSC.ServerResponseError, TSC.server.endpoint.exceptions.InternalServerError)) and \
+                str(error.code)[:3] in ('429', '503'):
+            return True
+        # any other failure may come after the server processed the request, so only an idempotent one is sent again
+        return idempotent and isinstance(error, (TSC.server.endpoint.exceptions.InternalServerError,
+                                                 requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def _run_one(self, function, item, idempotent):
+        delay = RETRY_DELAY
+        for attempt in range(self.retries + 1):
+            if self._token_bucket is not None:
+                with trace_span("rate limit", "wait"):
+                    self._token_bucket.acquire()
+            try:
+                return item, function(item), None
+            except Exception as error:
+                if attempt == self.retries or not BulkExecutor.is_transient(error, idempotent):
+                    return item, None, error
+                logging.info("Retrying in {} seconds after {}".format(delay, error))
+                with trace_span("retry delay", "wait", {"error": str(error)}):
+                    sleep(delay)
+                delay *= 2
+
+    def run(self, function, items, idempotent=True):
+        """
+        Pass idempotent=False for a POST or DELETE, which is then retried only when the server rejected it
+        with 429 or 503, and not after a connection error, a timeout or another server error.
+        """
+        items = list(items)
+        if len(items) == 0:
+            return list()
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(lambda item: self._run_one(function, item, idempotent), items))
+
+
+def describe_error(error):
+    return error.detail if isinstance(error, TSC.ServerResponseError) else str(error)
+
+
+def update_workbooks_in_bulk(server, bulk_executor, workbooks_and_paths, data_acceleration_config):
+    def update(workbook_and_path):
+        workbook, path = workbook_and_path
+        workbook.data_acceleration_config = data_acceleration_config
+        update_workbook_internal(server, workbook)
+
+    rows = list()
+    failed_rows = list()
+    results = bulk_executor.run(update, workbooks_and_paths)
+    for (workbook, path), result, error in results:
+        if error is None:
+            rows.append(["{}/{}".format(path, workbook.name)])
+        else:
+            failed_rows.append(["{}/{}".format(path, workbook.name), describe_error(error)])
+
+    metadata_cache = get_metadata_cache(server)
+    if metadata_cache is not None:
+        metadata_cache.put_workbooks([workbook for (workbook, path), result, error in results if error is None])
+
+    enabled_or_disabled = "Enabled" if data_acceleration_config["acceleration_enabled"] else "Disabled"
+    print_table(rows, ["Project/Workbook"], "Workbooks {}".format(enabled_or_disabled))
+    if len(failed_rows) > 0:
+        print_table(failed_rows, ["Project/Workbook", "Error"], "Workbooks not {}".format(enabled_or_disabled))
+    return len(failed_rows) == 0
+
+
 def update_workbook_internal(server, workbook):
     # without removing the workbook name, the rest api server code will
     # think the user would change the name of the workbook
-    try:
-        workbook_name = workbook.name
-        workbook.name = None
-        server.workbooks.update(workbook)
-    finally:
-        workbook.name = workbook_name
+    workbook_item = workbook.to_workbook_item()
+    workbook_item.name = None
+    server.workbooks.update(workbook_item)
 
 
-def update_workbook_by_path(workbook_path, server, data_acceleration_config, workbook_id_to_schedules):
+def update_workbook_by_path(workbook_path, server, data_acceleration_config, task_index,
+                            bulk_executor):
     workbook_id_to_workbook = get_workbook_from_path(server, workbook_path)
-    rows = list()
+    workbooks_to_update = list()
     for workbook, path in workbook_id_to_workbook.values():
-        try:
-            workbook.data_acceleration_config = data_acceleration_config
-
-            if confirm_workbook_update(workbook, path, workbook_id_to_schedules, data_acceleration_config, None) \
-                    in [UserResponse.YES, UserResponse.YES_FOR_ALL]:
-                update_workbook_internal(server, workbook)
-                rows.append(["{}/{}".format(path, workbook.name)])
-        except ServerResponseError as error:
-            print("Unable to {} {}/{}. {}".format(
-                "enable" if data_acceleration_config["acceleration_enabled"] else "disable",
-                path, workbook.name, error.detail
-            ))
-            return False
-    enabled_or_disabled = data_acceleration_config["acceleration_enabled"]
-    print_table(rows, ["Project/Workbook"], "Workbooks {}".format(
-        "Enabled" if enabled_or_disabled else "Disabled"))
-
-
-def get_all_materialized_views_tasks(server):
-    tasks = list(TSC.Pager(lambda options: server.tasks.get(task_type=TSC.TaskItem.Type.DataAcceleration)))
-    workbook_id_to_schedules = dict()
-    for task in tasks:
-        if task.target.id not in workbook_id_to_schedules:
-            workbook_id_to_schedules[task.target.id] = list()
-        workbook_id_to_schedules[task.target.id].append(task.schedule_item.name)
-    return workbook_id_to_schedules
+        if confirm_workbook_update(workbook, path, task_index, data_acceleration_config, None) \
+                in [UserResponse.YES, UserResponse.YES_FOR_ALL]:
+            workbooks_to_update.append((workbook, path))
+    return update_workbooks_in_bulk(server, bulk_executor, workbooks_to_update, data_acceleration_config)
 
 
 def update_workbook(server, args, data_acceleration_config, site_content_url):
@@ -1405,37 +3147,95 @@ def update_workbook(server, args, data_acceleration_config, site_content_url):
     if not assert_site_enabled_for_materialized_views(server, site_content_url):
         return False
 
-    workbook_id_to_schedules = None
+    task_index = None
     if not data_acceleration_config["acceleration_enabled"]:
-        workbook_id_to_schedules = get_all_materialized_views_tasks(server)
+        task_index = get_task_index(server)
 
     if args.path_list is not None:
         workbook_path_mapping = parse_workbook_path(args.path_list)
-        all_projects = {project.id: project for project in TSC.Pager(server.projects)}
-        update_workbooks_by_paths(all_projects, data_acceleration_config,
-                                  server, workbook_path_mapping, workbook_id_to_schedules)
+        update_workbooks_by_paths(get_project_tree(server), data_acceleration_config,
+                                  server, workbook_path_mapping, task_index,
+                                  BulkExecutor.from_args(args))
     elif workbook_path is not None:
-        update_workbook_by_path(workbook_path, server, data_acceleration_config, workbook_id_to_schedules)
+        update_workbook_by_path(workbook_path, server, data_acceleration_config, task_index,
+                                BulkExecutor.from_args(args))
 
     return True
 
 
-def print_table(rows, columns, header, right_aligned_columns=None):
-    if rows is None or len(rows) == 0:
-        print("{}: None".format(header))
-    else:
+class ReportWriter:
+    """
+    Writes the reports of the commands, either as tables for the terminal or as CSV or JSON Lines rows.
+    CSV and JSON Lines rows are written as soon as they are produced, and are only sorted when asked for.
+    'output_format' table, csv or jsonl
+    'pager'         wait for Enter between pages of a table, only when the input is a terminal
+    'sort'          sort the CSV and JSON Lines rows in the order of the tables
+    'file'          where the CSV and JSON Lines rows are written, the standard output at creation by default
+    """
+
+    def __init__(self, output_format="table", pager=True, sort=False, file=None):
+        self.output_format = output_format
+        self.pager = pager
+        self.sort = sort
+        self.file = file
+        self.out = file if file is not None else sys.stdout
+
+    @classmethod
+    def from_args(cls, args):
+        report_file = None
+        if args.output_file is not None:
+            report_file = open(args.output_file, "w", newline="")
+        return cls(args.output, not args.no_pager, args.sort, report_file)
+
+    @property
+    def streaming(self):
+        return self.output_format != "table"
+
+    def write(self, rows, columns, header, right_aligned_columns=None, sort_key=None):
+        if not self.streaming:
+            rows = list(rows)
+            if sort_key is not None:
+                rows.sort(key=sort_key)
+            with get_profiler().phase("table rendering"):
+                self.print_table(rows, columns, header, right_aligned_columns)
+            return
+
+        if self.sort and sort_key is not None:
+            rows = sorted(rows, key=sort_key)
+        # the rows of csv and jsonl reports are built while they are written
+        with get_profiler().phase("table rendering"):
+            report = header.strip()
+            if self.output_format == "csv":
+                writer = csv.writer(self.out)
+                writer.writerow(["Report"] + columns)
+                for row in rows:
+                    writer.writerow([report] + [report_value(value) if value is not None else '' for value in row])
+            else:
+                for row in rows:
+                    record = OrderedDict([("report", report)])
+                    record.update(zip(columns, (report_value(value) for value in row)))
+                    self.out.write(json.dumps(record) + "\n")
+            self.out.flush()
+
+    def print_table(self, rows, columns, header, right_aligned_columns=None):
+        if rows is None or len(rows) == 0:
+            print("{}: None".format(header))
+            return
+
         alignments = list()
         for column in columns:
             alignments.append("right" if right_aligned_columns is not None and \
                                          column in right_aligned_columns else "left")
 
-        pages = [rows[i * PAGE_SIZE: (i + 1) * PAGE_SIZE] for i in range((len(rows) + PAGE_SIZE - 1) // PAGE_SIZE)]
+        # without a terminal to press Enter in, the whole table is printed at once
+        page_size = PAGE_SIZE if self.pager and sys.stdin.isatty() else len(rows)
+        pages = [rows[i * page_size: (i + 1) * page_size] for i in range((len(rows) + page_size - 1) // page_size)]
         first_page_printed = False
         for page in pages:
             if first_page_printed:
                 raw_input("Press Enter to Continue...")
 
-            table = tabulate(page, columns, tablefmt="pretty", colalign=alignments)
+            table = tabulate.tabulate(page, columns, tablefmt="pretty", colalign=alignments)
 
             print("{} {}".format(header, "(Cont.)" if first_page_printed else ""))
             print(table)
@@ -1443,7 +3243,32 @@ def print_table(rows, columns, header, right_aligned_columns=None):
             if not first_page_printed:
                 first_page_printed = True
 
-def confirm_workbook_update(workbook, path, workbook_id_to_schedules,
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def report_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+# how the reports of this run are written, set from the command line options
+_report_writer = ReportWriter()
+
+
+def get_report_writer():
+    return _report_writer
+
+
+def print_table(rows, columns, header, right_aligned_columns=None, sort_key=None):
+    """
+    Writes a report in the output format of the run. 'rows' may be a generator.
+    'sort_key' sorts the rows of tables, and of CSV and JSON Lines when --sort is used.
+    """
+    get_report_writer().write(rows, columns, header, right_aligned_columns, sort_key)
+
+
+def confirm_workbook_update(workbook, path, task_index,
                             data_acceleration_config, previous_confirmation):
     if previous_confirmation in [UserResponse.YES_FOR_ALL, UserResponse.NO_FOR_ALL]:
         return previous_confirmation
@@ -1451,52 +3276,42 @@ def confirm_workbook_update(workbook, path, workbook_id_to_schedules,
     if data_acceleration_config["acceleration_enabled"]:
         return UserResponse.YES_FOR_ALL
 
-    if workbook.id not in workbook_id_to_schedules:
+    schedule_names = task_index.schedule_names(workbook.id)
+    if len(schedule_names) == 0:
         return UserResponse.YES
 
     return confirm("{}/{} is on schedules {}. Disabling it will "
                    "remove it from the schedules. Would you confirm? \n"
                    "Press Y for yes, N for No, A for yes_for_all, Q for no_for_all: ".
-                   format(path, workbook.name, workbook_id_to_schedules[workbook.id]),
+                   format(path, workbook.name, schedule_names),
                    [UserResponse.YES, UserResponse.NO, UserResponse.YES_FOR_ALL, UserResponse.NO_FOR_ALL])
 
 
-def update_workbooks_by_paths(all_projects, data_acceleration_config, server,
-                              workbook_path_mapping, workbook_id_to_schedules):
-    rows = list()
+def update_workbooks_by_paths(project_tree, data_acceleration_config, server,
+                              workbook_path_mapping, task_index, bulk_executor):
+    # all the confirmations are asked for before any workbook is updated
+    workbooks_to_update = list()
     update_confirmation = None
+    workbook_name_to_workbooks = get_workbooks_by_names(server, workbook_path_mapping.keys())
     for workbook_name, workbook_paths in workbook_path_mapping.items():
-        req_option = TSC.RequestOptions()
-        req_option.filter.add(TSC.Filter(TSC.RequestOptions.Field.Name,
-                                         TSC.RequestOptions.Operator.Equals,
-                                         workbook_name))
-        workbooks = list(TSC.Pager(server.workbooks, req_option))
+        workbooks = workbook_name_to_workbooks[workbook_name]
         all_paths = set(workbook_paths[:])
 
         for workbook in workbooks:
-            path = find_project_path(all_projects[workbook.project_id], all_projects, "")
+            path = project_tree.path(workbook.project_id)
             if path in workbook_paths:
                 all_paths.remove(path)
-                workbook.data_acceleration_config = data_acceleration_config
 
-                update_confirmation = confirm_workbook_update(workbook, path, workbook_id_to_schedules,
+                update_confirmation = confirm_workbook_update(workbook, path, task_index,
                                                               data_acceleration_config, update_confirmation)
 
                 if update_confirmation in [UserResponse.YES_FOR_ALL, UserResponse.YES]:
-                    try:
-                        update_workbook_internal(server, workbook)
-                        rows.append(["{}/{}".format(path, workbook.name)])
-                    except ServerResponseError as error:
-                        print("Unable to {} {}/{} due to {}".format(
-                            "enable" if data_acceleration_config["acceleration_enabled"] else "disable",
-                            path, workbook.name, error.detail
-                        ))
+                    workbooks_to_update.append((workbook, path))
         for path in all_paths:
             print("Cannot find workbook path: {}, each line should only contain one workbook path"
                   .format(path + '/' + workbook_name))
 
-    enabled_or_disabled = "Enabled" if data_acceleration_config["acceleration_enabled"] else "Disabled"
-    print_table(rows, ["Project/Workbook"], "Workbooks {}".format(enabled_or_disabled))
+    return update_workbooks_in_bulk(server, bulk_executor, workbooks_to_update, data_acceleration_config)
 
 
 def update_site(server, args, site_content_url):
@@ -1506,6 +3321,8 @@ def update_site(server, args, site_content_url):
     site_to_update = server.sites.get_by_content_url(site_content_url)
     site_to_update.data_acceleration_mode = "enable_selective" if args.enable is not None else "disable"
     server.sites.update(site_to_update)
+    _current_sites[server] = site_to_update
+    writeSessionCache(server.auth_token, server.version, site_to_update)
     print("Updated Workbook Acceleration settings for site: {}\n".format(site_to_update.name))
     return True
 
@@ -1527,7 +3344,9 @@ def assert_site_options_valid(args):
 
 
 def assert_site_enabled_for_materialized_views(server, site_content_url):
-    parent_site = server.sites.get_by_content_url(site_content_url)
+    parent_site = get_current_site(server)
+    if parent_site.content_url != site_content_url:
+        parent_site = server.sites.get_by_content_url(site_content_url)
     if parent_site.data_acceleration_mode == "disable":
         print('Cannot update workbook/project because site is disabled for Workbook Acceleration')
         return False
@@ -1541,17 +3360,6 @@ def assert_project_valid(project_name, projects):
     return True
 
 
-def find_projects_to_update(project, all_projects, projects_to_update):
-    # Use recursion to find all the sub-projects and enable/disable the workbooks in them
-    projects_to_update.append(project)
-    children_projects = [child for child in all_projects if child.parent_id == project.id]
-    if len(children_projects) == 0:
-        return
-
-    for child in children_projects:
-        find_projects_to_update(child, all_projects, projects_to_update)
-
-
 def sanitize_workbook_list(file_name, file_type):
     if not os.path.isfile(file_name):
         print("Invalid file name '{}'".format(file_name))
@@ -0,0 +1,121 @@
+"""
+Times whole commands of accelerate_workbooks.py against the local mock server at several site sizes,
+and counts the requests every command sends.
+
+    python benchmarks/bench_end_to_end.py [--scales small,medium] [--latency 0.01] [--repeat 3]
+                                          [--script accelerate_workbooks.py] [--counts]
+
+Every run is a new process that signs in, so the times include the sign in and the start up.
+Every run also gets a freshly generated site, so the enable commands always find the same
+workbooks to update. Pass the script of another revision with --script to compare the two;
+the site of a scale is generated from the same seed every time.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from mock_tableau_server import MockTableauServer, SyntheticSite  # noqa: E402
+
+SCRIPT = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, "accelerate_workbooks.py")
+
+# projects, project depth, workbooks and Workbook Acceleration tasks of every scale
+SCALES = {
+    "small": dict(num_projects=20, depth=3, num_workbooks=200, num_tasks=100),
+    "medium": dict(num_projects=200, depth=4, num_workbooks=2000, num_tasks=1000),
+    "large": dict(num_projects=1000, depth=5, num_workbooks=10000, num_tasks=5000),
+}
+
+# number of workbooks in the path list of the path-list enable command
+PATH_LIST_SIZE = 100
+
+
+def path_list_file(site, directory):
+    file_name = os.path.join(directory, "paths.txt")
+    with open(file_name, "w") as f:
+        for workbook in site.workbooks[:PATH_LIST_SIZE]:
+            f.write(site.workbook_path(workbook) + "\n")
+    return file_name
+
+
+def top_level_project_path(site):
+    # the first top level project with sub projects, so project-path enable walks a sub tree
+    parent_ids = set(project["parent_id"] for project in site.projects)
+    for project in site.projects:
+        if project["parent_id"] is None and project["id"] in parent_ids:
+            return project["name"]
+    return site.projects[0]["name"]
+
+
+COMMANDS = [
+    ("--status", lambda site, directory: ["--status"]),
+    ("--show-tasks", lambda site, directory: ["--show-tasks"]),
+    ("--compare", lambda site, directory: ["--compare"]),
+    ("path-list enable", lambda site, directory: ["--enable", "--path-list", path_list_file(site, directory)]),
+    ("project-path enable", lambda site, directory: ["--enable", "--type", "project-path",
+                                                     "--project-path", top_level_project_path(site)]),
+]
+
+
+def run(script, server, arguments, directory):
+    command = [sys.executable, script, "--server", server.url, "--username", "admin",
+               "--password", server.password, "--site", ""] + arguments
+    # stdin is not a terminal, so tables are not paged; every confirmation is answered with "a" (all)
+    result = subprocess.run(command, cwd=directory, input="a\n" * 100, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0 or "Unable to" in result.stdout:
+        print("  {} failed:\n{}{}".format(" ".join(arguments), result.stdout[-2000:], result.stderr[-2000:]))
+
+
+def measure(script, scale, command, latency, repeat):
+    times = list()
+    for _ in range(repeat):
+        site = SyntheticSite(**SCALES[scale])
+        server = MockTableauServer(site, latency=latency).start()
+        directory = tempfile.mkdtemp()
+        try:
+            arguments = command(site, directory)
+            server.reset_stats()
+            times.append(timeit.timeit(lambda: run(script, server, arguments, directory), number=1))
+            request_counts = dict(server.request_counts)
+            bytes_sent = server.bytes_sent
+        finally:
+            server.stop()
+    return times, request_counts, bytes_sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark commands of accelerate_workbooks.py end to end.')
+    parser.add_argument('--script', default=SCRIPT)
+    parser.add_argument('--scales', default="small,medium",
+                        help='comma separated list of {}'.format(", ".join(SCALES)))
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds the mock server adds to every request')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--counts', action='store_true', help='also print the requests of every endpoint')
+    args = parser.parse_args()
+
+    script = os.path.realpath(args.script)
+    scales = args.scales.split(",")
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error("unknown scale {}, choose from {}".format(scale, ", ".join(SCALES)))
+
+    print("{:<8} {:<20} {:>10} {:>10} {:>9} {:>12}".format(
+        "scale", "command", "median s", "min s", "requests", "bytes"))
+    for scale in scales:
+        for name, command in COMMANDS:
+            times, request_counts, bytes_sent = measure(script, scale, command, args.latency, args.repeat)
+            print("{:<8} {:<20} {:>10.2f} {:>10.2f} {:>9} {:>12,}".format(
+                scale, name, statistics.median(times), min(times), sum(request_counts.values()), bytes_sent))
+            if args.counts:
+                for endpoint, count in sorted(request_counts.items()):
+                    print("{:>30} {}".format(count, endpoint))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares the sub-project discovery used by --type project-path before and after the
+parent -> children index, on synthetic deep and wide project trees.
+
+    python benchmarks/bench_project_subtree.py [--projects 12000]
+
+The previous implementation scanned every project to find the children of each visited
+project (O(P^2)) and recursed once per level, so the deep tree is capped below the
+recursion limit for it.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from accelerate_workbooks import ProjectTree, find_project_ids_to_update  # noqa: E402
+
+
+class SyntheticProject:
+    def __init__(self, id_, name, parent_id):
+        self.id = id_
+        self.name = name
+        self.parent_id = parent_id
+
+
+def wide_tree(num_projects, fan_out=10):
+    # a complete tree: project i is the parent of projects i * fan_out + 1 ... i * fan_out + fan_out
+    return [SyntheticProject(str(i), "Project {}".format(i), str((i - 1) // fan_out) if i > 0 else None)
+            for i in range(num_projects)]
+
+
+def deep_tree(num_projects):
+    # a single chain of nested projects
+    return [SyntheticProject(str(i), "Project {}".format(i), str(i - 1) if i > 0 else None)
+            for i in range(num_projects)]
+
+
+def previous_find_projects_to_update(project, all_projects, projects_to_update):
+    projects_to_update.append(project)
+    children_projects = [child for child in all_projects if child.parent_id == project.id]
+    for child in children_projects:
+        previous_find_projects_to_update(child, all_projects, projects_to_update)
+
+
+def previous_find_project_ids_to_update(all_projects, project):
+    projects_to_update = []
+    previous_find_projects_to_update(project, all_projects, projects_to_update)
+    return set([project_to_update.id for project_to_update in projects_to_update])
+
+
+def best_of(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def compare(name, projects, repeat):
+    root = projects[0]
+
+    def indexed():
+        return find_project_ids_to_update(ProjectTree(projects), root)
+
+    def previous():
+        return previous_find_project_ids_to_update(projects, root)
+
+    assert indexed() == previous()
+    indexed_seconds = best_of(indexed, repeat)
+    previous_seconds = best_of(previous, repeat)
+    print("{:<6} {:>8} projects  previous {:>9.4f}s  indexed {:>9.4f}s  speedup {:>8.1f}x".format(
+        name, len(projects), previous_seconds, indexed_seconds, previous_seconds / indexed_seconds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sub-project discovery.')
+    parser.add_argument('--projects', type=int, default=12000, help='number of projects in the wide tree')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    compare("wide", wide_tree(args.projects), args.repeat)
+    compare("deep", deep_tree(min(args.projects, sys.getrecursionlimit() - 100)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
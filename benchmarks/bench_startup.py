@@ -0,0 +1,69 @@
+"""
+Measures the start up time of accelerate_workbooks.py for commands that do not talk to a server:
+--logout without a session and invalid options, next to an empty Python start up for reference.
+It also lists the slowest imports of one --logout run, from python -X importtime.
+
+    python benchmarks/bench_startup.py [--repeat 20] [--script accelerate_workbooks.py]
+
+Every run is a new process started in an empty directory, so no session is found.
+Pass the script of another revision with --script to compare the two.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+SCRIPT = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, "accelerate_workbooks.py")
+
+COMMANDS = [
+    ("python -c pass", ["-c", "pass"], False),
+    ("--logout", ["--logout"], True),
+    ("invalid option", ["--workers", "0"], True),
+    ("unknown option", ["--unknown-option"], True),
+]
+
+
+def run(arguments, directory):
+    # only the session environment variables are removed, so --logout does not find a session
+    environment = {name: value for name, value in os.environ.items()
+                   if name not in ["auth_token", "site_id", "user_id", "server_url", "ssl_cert_pem"]}
+    subprocess.run([sys.executable] + arguments, cwd=directory, env=environment,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def slowest_imports(script, directory, count):
+    result = subprocess.run([sys.executable, "-X", "importtime", script, "--logout"], cwd=directory,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    imports = list()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", top level imports are not indented
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit() and not fields[2].startswith("  "):
+            imports.append((int(fields[1]), fields[2].strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the start up time of accelerate_workbooks.py.')
+    parser.add_argument('--script', default=SCRIPT)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    script = os.path.realpath(args.script)
+    directory = tempfile.mkdtemp()
+    for name, arguments, uses_script in COMMANDS:
+        arguments = [script] + arguments if uses_script else arguments
+        times = timeit.repeat(lambda: run(arguments, directory), number=1, repeat=args.repeat)
+        print("{:<16} median {:>7.1f} ms  min {:>7.1f} ms".format(
+            name, statistics.median(times) * 1000, min(times) * 1000))
+
+    print("\nSlowest top level imports of --logout:")
+    for cumulative, name in slowest_imports(script, directory, 8):
+        print("{:>9.1f} ms  {}".format(cumulative / 1000.0, name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares the peak RSS of holding every workbook of a site with its project path, as --status does,
+with TSC WorkbookItem objects and with the compact WorkbookRecord objects.
+
+    python benchmarks/bench_workbook_memory.py [--workbooks 100000] [--projects 500]
+
+Every variant runs in its own process, so the peak of one does not hide the other.
+Peak RSS is read with the resource module, which is not available on Windows.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+import tableauserverclient as TSC  # noqa: E402
+from accelerate_workbooks import ProjectTree, ProjectRecord, parse_items, tableau_tag, workbook_from_element, \
+    xmlns  # noqa: E402
+
+PAGE_SIZE = 1000
+
+RESPONSE = '<?xml version="1.0" encoding="UTF-8"?>' \
+           '<tsResponse xmlns="http://tableau.com/api"><pagination pageNumber="{page}" pageSize="{page_size}" ' \
+           'totalAvailable="{total}"/><workbooks>{items}</workbooks></tsResponse>'
+
+
+def project_id(i):
+    return "8a3e9f1c-0000-4000-8000-{:012d}".format(i)
+
+
+def synthetic_projects(num_projects):
+    # ten top level projects, every other project nested three levels down
+    return [ProjectRecord(project_id(i), "Project {}".format(i), project_id(i // 10) if i >= 10 else None)
+            for i in range(num_projects)]
+
+
+def synthetic_pages(num_workbooks, num_projects):
+    for page in range((num_workbooks + PAGE_SIZE - 1) // PAGE_SIZE):
+        items = ''.join(
+            '<workbook id="1f0c6d2a-0000-4000-8000-{0:012d}" name="Workbook {0}" contentUrl="Workbook{0}" '
+            'showTabs="true" updatedAt="2020-06-01T10:00:00Z"><project id="{1}" name="Project {2}"/>'
+            '<owner id="5b7d2c4e-0000-4000-8000-000000000001"/><dataAccelerationConfig accelerationEnabled="true" '
+            'accelerationStatus="accelerated" lastUpdatedAt="2020-06-02T10:00:00Z"/></workbook>'.format(
+                i, project_id(i % num_projects), i % num_projects)
+            for i in range(page * PAGE_SIZE, min(num_workbooks, (page + 1) * PAGE_SIZE)))
+        yield RESPONSE.format(page=page + 1, page_size=PAGE_SIZE, total=num_workbooks, items=items).encode()
+
+
+def read_tsc_items(content):
+    return TSC.WorkbookItem.from_response(content, xmlns)
+
+
+def read_records(content):
+    return parse_items(content, tableau_tag("workbook"), workbook_from_element)[0]
+
+
+def peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(variant, num_workbooks, num_projects):
+    project_tree = ProjectTree(synthetic_projects(num_projects))
+    read_page = read_tsc_items if variant == "tsc" else read_records
+    # warm up the parser, so its own allocations are not counted
+    read_page(next(synthetic_pages(1, num_projects)))
+    rss_before = peak_rss()
+
+    workbook_id_to_workbook = dict()
+    for content in synthetic_pages(num_workbooks, num_projects):
+        for workbook in read_page(content):
+            workbook_id_to_workbook[workbook.id] = workbook, project_tree.path(workbook.project_id)
+    print(peak_rss() - rss_before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory used by the workbooks of a site.')
+    parser.add_argument('--workbooks', type=int, default=100000)
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--variant', choices=["tsc", "records"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant is not None:
+        measure(args.variant, args.workbooks, args.projects)
+        return
+
+    peaks = dict()
+    for variant in ["tsc", "records"]:
+        output = subprocess.check_output([sys.executable, os.path.realpath(__file__), "--variant", variant,
+                                          "--workbooks", str(args.workbooks), "--projects", str(args.projects)])
+        peaks[variant] = int(output.decode().strip().splitlines()[-1])
+        print("{:<8} {:>8} workbooks  peak RSS {:>8.1f} MB  {:>6.1f} MB per 10k workbooks".format(
+            variant, args.workbooks, peaks[variant] / 1e6, peaks[variant] / 1e6 * 10000 / args.workbooks))
+    print("records use {:.1f}x less memory".format(peaks["tsc"] / float(max(peaks["records"], 1))))
+
+
+if __name__ == "__main__":
+    main()
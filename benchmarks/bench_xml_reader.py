@@ -0,0 +1,134 @@
+"""
+Compares the time and peak memory of the streaming readers of workbook, task and job pages and of the
+TSC from_response methods on synthetic pages.
+
+    python benchmarks/bench_xml_reader.py [--items 1000]
+
+tests/test_xml_reader.py checks that both return the same items.
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+import tableauserverclient as TSC  # noqa: E402
+from accelerate_workbooks import parse_items, tableau_tag, workbook_from_element, task_from_element, \
+    job_with_notes_from_element, workbook_to_record, xmlns  # noqa: E402
+
+RESPONSE = '<?xml version="1.0" encoding="UTF-8"?>' \
+           '<tsResponse xmlns="http://tableau.com/api"><pagination pageNumber="1" pageSize="{count}" ' \
+           'totalAvailable="{total}"/><{collection}>{items}</{collection}></tsResponse>'
+
+
+def synthetic_workbooks(count):
+    items = ''.join(
+        '<workbook id="wb-{0}" name="Workbook {0}" contentUrl="Workbook{0}" '
+        'webpageUrl="https://server/#/workbooks/{0}" '
+        'showTabs="{1}" size="{0}" createdAt="2020-01-01T10:00:00Z" updatedAt="2020-06-01T10:00:{2:02d}Z">'
+        '<project id="project-{3}" name="Project {3}"/><owner id="user-1"/>'
+        '<tags><tag label="sales"/></tags>'
+        '<dataAccelerationConfig accelerationEnabled="{1}" accelerationStatus="accelerated" '
+        'lastUpdatedAt="2020-06-02T10:00:00Z"/></workbook>'.format(i, "true" if i % 2 else "false", i % 60, i % 50)
+        for i in range(count))
+    return RESPONSE.format(count=count, total=count * 3, collection="workbooks", items=items).encode()
+
+
+def synthetic_tasks(count):
+    items = ''.join(
+        '<task><dataAcceleration id="task-{0}" priority="50" consecutiveFailedCount="{1}" type="MaterializeViewsTask">'
+        '<schedule id="schedule-{1}" name="Schedule {1}" state="Active" priority="50" type="DataAcceleration" '
+        'executionOrder="Parallel" frequency="Daily" nextRunAt="2020-06-03T02:00:00Z" '
+        'createdAt="2020-01-01T10:00:00Z" updatedAt="2020-01-02T10:00:00Z">'
+        '<frequencyDetails start="02:00:00"/></schedule>'
+        '<workbook id="wb-{0}"/><lastRunAt>2020-06-02T02:00:00Z</lastRunAt></dataAcceleration></task>'.format(i, i % 5)
+        for i in range(count))
+    return RESPONSE.format(count=count, total=count, collection="tasks", items=items).encode()
+
+
+def synthetic_jobs(count):
+    items = ''.join(
+        '<backgroundJob id="job-{0}" status="Success" jobType="materialize_views" priority="50" '
+        'createdAt="2020-06-02T10:00:00Z" startedAt="2020-06-02T10:00:05Z" endedAt="2020-06-02T10:01:00Z" '
+        'title="Workbook {0}" subtitle="Project 1"><notes>wb-{0}: Materialized</notes></backgroundJob>'.format(i)
+        for i in range(count))
+    return RESPONSE.format(count=count, total=count, collection="backgroundJobs", items=items).encode()
+
+
+def task_to_record(task):
+    if isinstance(task, TSC.TaskItem):
+        return task.id, task.target.id, task.schedule_item.name, task.schedule_item.next_run_at
+    return task.id, task.workbook_id, task.schedule_name, task.next_run_at
+
+
+def job_to_record(job):
+    return (job.id, job.type, job.status, job.priority, job.created_at, job.started_at, job.ended_at,
+            job.title, job.subtitle)
+
+
+def tsc_jobs_with_notes(content):
+    # the jobs as TSC reads them, next to the notes read from the whole page as one tree
+    notes = list()
+    for job_element in ET.fromstring(content).findall('.//t:backgroundJob', namespaces=xmlns):
+        job_notes = [job_element.get('notes', '')]
+        job_notes.extend(notes_element.text or ''
+                         for notes_element in job_element.findall('.//t:notes', namespaces=xmlns))
+        notes.append('\n'.join(job_notes))
+    return list(zip(TSC.BackgroundJobItem.from_response(content, xmlns), notes))
+
+
+READERS = {
+    "workbooks": ("workbook", workbook_from_element, lambda content: TSC.WorkbookItem.from_response(content, xmlns),
+                  workbook_to_record),
+    "tasks": ("dataAcceleration", task_from_element,
+              lambda content: TSC.TaskItem.from_response(content, xmlns, TSC.TaskItem.Type.DataAcceleration),
+              task_to_record),
+    "jobs": ("backgroundJob", job_with_notes_from_element, tsc_jobs_with_notes,
+             lambda job_and_notes: (job_to_record(job_and_notes[0]), job_and_notes[1])),
+}
+
+
+def streaming_reader(kind):
+    item_name, from_element = READERS[kind][:2]
+    return lambda content: parse_items(content, tableau_tag(item_name), from_element)
+
+
+def peak_memory(function, content):
+    tracemalloc.start()
+    function(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def best_of(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def compare(kind, content, repeat):
+    streaming, tsc = streaming_reader(kind), READERS[kind][2]
+    count = len(streaming(content)[0])
+    streaming_seconds = best_of(lambda: streaming(content), repeat)
+    tsc_seconds = best_of(lambda: tsc(content), repeat)
+    print("{:<10} {:>6} items  {:>9,} bytes  TSC {:>8.4f}s {:>11,} B peak  "
+          "streaming {:>8.4f}s {:>11,} B peak".format(
+              kind, count, len(content), tsc_seconds, peak_memory(tsc, content),
+              streaming_seconds, peak_memory(streaming, content)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the streaming XML readers.')
+    parser.add_argument('--items', type=int, default=1000, help='items per synthetic page')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    compare("workbooks", synthetic_workbooks(args.items), args.repeat)
+    compare("tasks", synthetic_tasks(args.items), args.repeat)
+    compare("jobs", synthetic_jobs(args.items), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
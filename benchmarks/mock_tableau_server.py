@@ -0,0 +1,719 @@
+"""
+A local stand-in for the subset of the Tableau Server REST API used by accelerate_workbooks.py.
+
+The server keeps an in-memory synthetic site (projects, workbooks, schedules,
+Workbook Acceleration tasks, background jobs and the data acceleration report),
+answers paged and filtered queries the way Tableau Server does, and counts
+every request it serves so benchmarks can report round trips.
+
+Run it standalone and point the script at the printed url, with any username and the printed password:
+
+    python benchmarks/mock_tableau_server.py [--projects 200] [--depth 4] [--workbooks 5000] [--tasks 2000]
+                                             [--latency 0.02] [--port 8765]
+
+benchmarks/bench_end_to_end.py starts it in process and runs the script against it.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qs, unquote
+
+REST_API_VERSION = "3.8"
+NAMESPACE = "http://tableau.com/api"
+MAX_PAGE_SIZE = 1000
+
+ACCELERATION_STATUSES = ["accelerated", "failed", "notUseful", "inProgress", "waiting"]
+STATUS_TO_NOTES = {
+    "accelerated": "Materialized",
+    "failed": "JobFailed",
+    "notUseful": "MaterializationNotUseful",
+}
+# the job types and titles of the other background jobs of a site, which outnumber the Workbook Acceleration jobs
+OTHER_JOB_TYPES = [("refresh_extracts", "Refresh Extracts"), ("increment_extracts", "Increment Extracts"),
+                   ("subscription_notify", "Subscription Notify"), ("run_flow", "Run Flow")]
+
+
+def _format_time(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value is not None else None
+
+
+def _parse_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+
+
+class SyntheticSite(object):
+    """
+    In-memory content of one site. All collections are plain lists of dicts so
+    the request handler can filter and page them without any database.
+    """
+
+    def __init__(self, num_projects=20, depth=3, num_workbooks=200, num_tasks=100,
+                 num_schedules=5, enabled_ratio=0.5, jobs_per_workbook=2, other_jobs_per_workbook=6, seed=0):
+        self.lock = threading.Lock()
+        self.site = {"id": str(uuid.UUID(int=1)), "name": "Default", "content_url": "",
+                     "data_acceleration_mode": "enable_selective"}
+        self.user_id = str(uuid.UUID(int=2))
+        self.projects = []
+        self.workbooks = []
+        self.schedules = []
+        self.tasks = []
+        self.jobs = []
+        self.comparison_records = []
+        self._generate(num_projects, depth, num_workbooks, num_tasks, num_schedules,
+                       enabled_ratio, jobs_per_workbook, random.Random(seed))
+        # generated with their own random numbers, so the rest of the site does not depend on them
+        self._generate_other_jobs(other_jobs_per_workbook, random.Random(seed + 1))
+
+    def _generate(self, num_projects, depth, num_workbooks, num_tasks, num_schedules,
+                  enabled_ratio, jobs_per_workbook, rng):
+        now = datetime.utcnow().replace(microsecond=0)
+
+        # projects: breadth-first, each level's parents chosen from the previous level
+        levels = [[]]
+        sibling_names = set()
+        for index in range(num_projects):
+            level = index % max(depth, 1)
+            parents = levels[level - 1] if level > 0 and len(levels) >= level and levels[level - 1] else None
+            parent_id = rng.choice(parents)["id"] if parents else None
+            # sibling projects have unique names on Tableau Server, cousins may share them
+            name = "Project {}".format(index % max(num_projects // 4, 1))
+            if (parent_id, name) in sibling_names:
+                name = "Project {}".format(index)
+            sibling_names.add((parent_id, name))
+            project = {"id": "p{:07d}".format(index), "name": name, "parent_id": parent_id,
+                       "updated_at": datetime(2020, 1, 1)}
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(project)
+            self.projects.append(project)
+
+        workbook_names = set()
+        for index in range(num_workbooks):
+            enabled = rng.random() < enabled_ratio
+            status = rng.choice(ACCELERATION_STATUSES) if enabled else None
+            workbook_id = "w{:07d}".format(index)
+            project_id = rng.choice(self.projects)["id"] if self.projects else None
+            # workbook names are unique within a project but repeat across projects
+            name = "Workbook {}".format(index % max(num_workbooks // 2, 1))
+            if (project_id, name) in workbook_names:
+                name = "Workbook {}".format(index)
+            workbook_names.add((project_id, name))
+            self.workbooks.append({
+                "id": workbook_id,
+                "name": name,
+                "content_url": "Workbook{}".format(index),
+                "project_id": project_id,
+                "enabled": enabled,
+                "status": status,
+                "last_updated_at": now - timedelta(hours=rng.randint(1, 48)) if enabled and rng.random() < 0.5
+                else None,
+                "updated_at": now - timedelta(days=rng.randint(1, 300)),
+            })
+            if enabled and status in STATUS_TO_NOTES:
+                for job_index in range(jobs_per_workbook):
+                    ended = now - timedelta(hours=rng.randint(1, 24 * 20))
+                    self.jobs.append({
+                        "id": "j{:07d}-{}".format(index, job_index),
+                        "jobType": "materialize_views",
+                        "status": "Success",
+                        "title": "Materialize Views",
+                        "subtitle": "Workbook",
+                        "notes": "{}: {}".format(workbook_id, STATUS_TO_NOTES[status]),
+                        "started_at": ended - timedelta(seconds=rng.randint(5, 600)),
+                        "ended_at": ended,
+                    })
+            if enabled and rng.random() < 0.3:
+                self.comparison_records.append({
+                    "sheet_uri": "{}/Sheet1".format(self.workbooks[-1]["content_url"]),
+                    "unaccelerated": rng.randint(0, 50), "avg_unaccelerated": rng.random() * 10,
+                    "accelerated": rng.randint(1, 50), "avg_accelerated": rng.random() * 2})
+
+        for index in range(num_schedules):
+            self.schedules.append({"id": "s{:07d}".format(index), "name": "Schedule {}".format(index),
+                                   "type": "DataAcceleration",
+                                   "next_run_at": now + timedelta(hours=index + 1)})
+
+        enabled_workbooks = [workbook for workbook in self.workbooks if workbook["enabled"]]
+        pairs = set()
+        for index in range(num_tasks):
+            if not enabled_workbooks or not self.schedules:
+                break
+            workbook = rng.choice(enabled_workbooks)
+            schedule = rng.choice(self.schedules)
+            if (workbook["id"], schedule["id"]) in pairs:
+                continue
+            pairs.add((workbook["id"], schedule["id"]))
+            self.tasks.append({"id": "t{:07d}".format(index), "workbook_id": workbook["id"],
+                               "schedule_id": schedule["id"]})
+
+    def project_by_id(self):
+        return {project["id"]: project for project in self.projects}
+
+    def _generate_other_jobs(self, other_jobs_per_workbook, rng):
+        now = datetime.utcnow().replace(microsecond=0)
+        for workbook in self.workbooks:
+            for job_index in range(other_jobs_per_workbook):
+                job_type, title = rng.choice(OTHER_JOB_TYPES)
+                # some of them completed before the default 30 days of job history
+                ended = now - timedelta(hours=rng.randint(1, 24 * 45))
+                failed = rng.random() < 0.1
+                self.jobs.append({
+                    "id": "j{}-x{}".format(workbook["id"][1:], job_index),
+                    "jobType": job_type,
+                    "status": "Failed" if failed else "Success",
+                    "title": title,
+                    "subtitle": workbook["name"],
+                    "notes": "{} failed: the data source could not be reached".format(title) if failed else "",
+                    "started_at": ended - timedelta(seconds=rng.randint(5, 3600)),
+                    "ended_at": ended,
+                })
+
+    def project_path(self, project_id):
+        projects = self.project_by_id()
+        names = list()
+        while project_id is not None:
+            names.append(projects[project_id]["name"])
+            project_id = projects[project_id]["parent_id"]
+        return "/".join(reversed(names))
+
+    def workbook_path(self, workbook):
+        return "{}/{}".format(self.project_path(workbook["project_id"]), workbook["name"])
+
+    def schedule_by_id(self):
+        return {schedule["id"]: schedule for schedule in self.schedules}
+
+
+def _matches(record, field, operator, value, resolvers):
+    actual = resolvers[field](record) if field in resolvers else record.get(field)
+    if operator == "eq":
+        return actual == value
+    if operator == "in":
+        return actual in value
+    if operator == "has":
+        return actual is not None and value in actual
+    if operator in ("gt", "gte", "lt", "lte"):
+        if actual is None:
+            return False
+        if isinstance(actual, datetime):
+            value = _parse_time(value)
+        return {"gt": actual > value, "gte": actual >= value,
+                "lt": actual < value, "lte": actual <= value}[operator]
+    raise ValueError("Unsupported operator {}".format(operator))
+
+
+def parse_filter_expression(expression):
+    filters = []
+    for match in re.finditer(r"(\w+):(\w+):(\[[^\]]*\]|[^,]*)", expression or ""):
+        field, operator, value = match.groups()
+        if operator == "in":
+            value = set(value.strip("[]").split(",")) if value.startswith("[") else {value}
+        filters.append((field, operator, value))
+    return filters
+
+
+class MockTableauHandler(BaseHTTPRequestHandler):
+    """
+    Routes every request through ROUTES, after counting it and sleeping for the configured latency.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "MockTableau/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- plumbing --------------------------------------------------------------------------------
+
+    def _dispatch(self, method):
+        state = self.server.state
+        parsed = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length > 0 else b""
+
+        route = "{} {}".format(method, re.sub(r"/api/[\d.]+", "/api/{v}", parsed.path))
+        with self.server.stats_lock:
+            self.server.request_counts[self._route_key(method, parsed.path)] += 1
+
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+
+        authenticated = self.headers.get("x-tableau-auth") == self.server.token
+        try:
+            for pattern, handler, needs_auth in ROUTES:
+                match = re.match(pattern, route)
+                if match is None:
+                    continue
+                if needs_auth and not authenticated:
+                    return self._error(401, "401002", "Unauthorized Access", "Invalid authentication credentials")
+                return handler(self, state, query, body, *match.groups())
+            return self._error(404, "404000", "Resource Not Found", "Unknown resource {}".format(parsed.path))
+        except UnsupportedFilter as error:
+            return self._error(400, "400065", "Bad Request", str(error))
+
+    @staticmethod
+    def _route_key(method, path):
+        path = re.sub(r"/api/[\d.]+", "", path)
+        path = re.sub(r"/sites/[^/]+", "/sites/{id}", path, count=1)
+        path = re.sub(r"/(w|p|t|s|j)\d{7}[^/]*", r"/{id}", path)
+        return "{} {}".format(method, path)
+
+    def _send(self, status, body, content_type="application/xml;charset=utf-8"):
+        payload = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.server.stats_lock:
+            self.server.bytes_sent += len(payload)
+
+    def _xml(self, root, status=200):
+        self._send(status, ET.tostring(root, encoding="utf-8"))
+
+    def _error(self, status, code, summary, detail):
+        root = _ts_response()
+        error = ET.SubElement(root, "error", code=code)
+        ET.SubElement(error, "summary").text = summary
+        ET.SubElement(error, "detail").text = detail
+        self._xml(root, status)
+
+    def _no_content(self):
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # -- paging and filtering -----------------------------------------------------------------------
+
+    def _page(self, records, query, resolvers=None, sort_keys=None):
+        resolvers = resolvers or {}
+        for field, operator, value in parse_filter_expression(query.get("filter")):
+            if field not in resolvers and (not records or field not in records[0]):
+                if operator != "in" or not self.server.supports_in_operator:
+                    raise UnsupportedFilter("Unsupported filter field {}".format(field))
+            if operator == "in" and not self.server.supports_in_operator:
+                raise UnsupportedFilter("Unsupported filter operator 'in'")
+            records = [record for record in records if _matches(record, field, operator, value, resolvers)]
+
+        for sort_expression in reversed((query.get("sort") or "").split(",")):
+            if not sort_expression:
+                continue
+            field, direction = sort_expression.split(":")
+            key = (sort_keys or {}).get(field, lambda record, field=field: record.get(field))
+            records = sorted(records, key=lambda record: (key(record) is None, key(record)),
+                             reverse=direction == "desc")
+
+        page_size = min(int(query.get("pageSize", 100)), MAX_PAGE_SIZE)
+        page_number = int(query.get("pageNumber", 1))
+        start = (page_number - 1) * page_size
+        return records[start:start + page_size], \
+            {"pageNumber": str(page_number), "pageSize": str(page_size), "totalAvailable": str(len(records))}
+
+
+class UnsupportedFilter(Exception):
+    """
+    Raised for a filter or parameter the emulated server version does not support; answered with a 400.
+    """
+
+
+def _ts_response():
+    return ET.Element("tsResponse", xmlns=NAMESPACE)
+
+
+def _pagination(root, pagination):
+    ET.SubElement(root, "pagination", **pagination)
+
+
+def _site_element(parent, site):
+    return ET.SubElement(parent, "site", id=site["id"], name=site["name"], contentUrl=site["content_url"],
+                         dataAccelerationMode=site["data_acceleration_mode"], state="Active")
+
+
+def _workbook_element(parent, workbook, projects, fields=None):
+    project = projects.get(workbook["project_id"], {})
+    attributes = {"id": workbook["id"], "name": workbook["name"], "contentUrl": workbook["content_url"],
+                  "webpageUrl": "https://mock/#/workbooks/{}".format(workbook["id"]),
+                  "showTabs": "true", "size": "1", "createdAt": _format_time(workbook["updated_at"]),
+                  "updatedAt": _format_time(workbook["updated_at"])}
+    if fields is not None:
+        attributes = {key: value for key, value in attributes.items() if key in fields}
+    element = ET.SubElement(parent, "workbook", **attributes)
+    if fields is None or "project.id" in fields or "project.name" in fields:
+        project_attributes = {"id": project.get("id", "")} if fields is None or "project.id" in fields else {}
+        if fields is None or "project.name" in fields:
+            project_attributes["name"] = project.get("name", "")
+        ET.SubElement(element, "project", **project_attributes)
+    if fields is None or "owner.id" in fields:
+        ET.SubElement(element, "owner", id="u0000001")
+    if fields is None:
+        tags = ET.SubElement(element, "tags")
+        ET.SubElement(tags, "tag", label="mock")
+    if fields is None or "dataAccelerationConfig" in fields:
+        config = {"accelerationEnabled": "true" if workbook["enabled"] else "false"}
+        if workbook["status"] is not None:
+            config["accelerationStatus"] = workbook["status"]
+        if workbook["last_updated_at"] is not None:
+            config["lastUpdatedAt"] = _format_time(workbook["last_updated_at"])
+        ET.SubElement(element, "dataAccelerationConfig", **config)
+    return element
+
+
+def _schedule_element(parent, schedule):
+    attributes = {"id": schedule["id"], "name": schedule["name"], "state": "Active", "priority": "50",
+                  "type": schedule["type"], "frequency": "Daily", "executionOrder": "Parallel"}
+    if schedule.get("next_run_at") is not None:
+        attributes["nextRunAt"] = _format_time(schedule["next_run_at"])
+    element = ET.SubElement(parent, "schedule", **attributes)
+    details = ET.SubElement(element, "frequencyDetails", start="00:00:00")
+    ET.SubElement(details, "intervals")
+    return element
+
+
+def _field_list(query):
+    fields = query.get("fields")
+    if fields is None or fields == "_all_":
+        return None
+    return set(fields.split(","))
+
+
+def handle_signin(handler, state, query, body):
+    request = ET.fromstring(body)
+    credentials = request.find("credentials")
+    if credentials is None or credentials.get("password") != handler.server.password:
+        return handler._error(401, "401001", "Signin Error", "Error signing in to Tableau Server")
+    root = _ts_response()
+    credentials_element = ET.SubElement(root, "credentials", token=handler.server.token)
+    _site_element(credentials_element, state.site)
+    ET.SubElement(credentials_element, "user", id=state.user_id)
+    handler._xml(root)
+
+
+def handle_signout(handler, state, query, body):
+    handler._no_content()
+
+
+def handle_server_info(handler, state, query, body):
+    root = _ts_response()
+    info = ET.SubElement(root, "serverInfo")
+    ET.SubElement(info, "productVersion", build="20204.0.0").text = "2020.4.0"
+    ET.SubElement(info, "restApiVersion").text = REST_API_VERSION
+    handler._xml(root)
+
+
+def handle_sites(handler, state, query, body):
+    root = _ts_response()
+    _pagination(root, {"pageNumber": "1", "pageSize": "100", "totalAvailable": "1"})
+    sites = ET.SubElement(root, "sites")
+    _site_element(sites, state.site)
+    handler._xml(root)
+
+
+def handle_site(handler, state, query, body, site_key):
+    site_key = unquote(site_key)
+    if query.get("key") == "contentUrl":
+        found = site_key == state.site["content_url"] or (site_key == "" and state.site["content_url"] == "")
+    else:
+        found = site_key == state.site["id"]
+    if not found:
+        return handler._error(404, "404000", "Resource Not Found", "Site {} not found".format(site_key))
+    root = _ts_response()
+    _site_element(root, state.site)
+    handler._xml(root)
+
+
+def handle_update_site(handler, state, query, body, site_id):
+    site = ET.fromstring(body).find("site")
+    with state.lock:
+        if site is not None and site.get("dataAccelerationMode") is not None:
+            state.site["data_acceleration_mode"] = site.get("dataAccelerationMode")
+    root = _ts_response()
+    _site_element(root, state.site)
+    handler._xml(root)
+
+
+def handle_projects(handler, state, query, body, site_id):
+    page, pagination = handler._page(state.projects, query, sort_keys={},
+                                     resolvers={"updatedAt": lambda project: project["updated_at"]})
+    root = _ts_response()
+    _pagination(root, pagination)
+    projects = ET.SubElement(root, "projects")
+    for project in page:
+        attributes = {"id": project["id"], "name": project["name"], "contentPermissions": "ManagedByOwner"}
+        if project["parent_id"] is not None:
+            attributes["parentProjectId"] = project["parent_id"]
+        ET.SubElement(ET.SubElement(projects, "project", **attributes), "owner", id="u0000001")
+    handler._xml(root)
+
+
+def _workbook_resolvers(state):
+    projects = state.project_by_id()
+    return projects, {
+        "projectName": lambda workbook: projects.get(workbook["project_id"], {}).get("name"),
+        "projectId": lambda workbook: workbook["project_id"],
+        "updatedAt": lambda workbook: workbook["updated_at"],
+        "contentUrl": lambda workbook: workbook["content_url"],
+    }
+
+
+def handle_workbooks(handler, state, query, body, site_id):
+    projects, resolvers = _workbook_resolvers(state)
+    fields = _field_list(query)
+    if fields is not None and not handler.server.supports_fields:
+        raise UnsupportedFilter("Unsupported parameter 'fields'")
+    page, pagination = handler._page(state.workbooks, query, resolvers)
+    root = _ts_response()
+    _pagination(root, pagination)
+    workbooks = ET.SubElement(root, "workbooks")
+    for workbook in page:
+        _workbook_element(workbooks, workbook, projects, fields)
+    handler._xml(root)
+
+
+def _find_workbook(state, workbook_id):
+    for workbook in state.workbooks:
+        if workbook["id"] == workbook_id:
+            return workbook
+    return None
+
+
+def handle_workbook(handler, state, query, body, site_id, workbook_id):
+    workbook = _find_workbook(state, workbook_id)
+    if workbook is None:
+        return handler._error(404, "404006", "Resource Not Found", "Workbook {} not found".format(workbook_id))
+    root = _ts_response()
+    _workbook_element(root, workbook, state.project_by_id())
+    handler._xml(root)
+
+
+def handle_update_workbook(handler, state, query, body, site_id, workbook_id):
+    workbook = _find_workbook(state, workbook_id)
+    if workbook is None:
+        return handler._error(404, "404006", "Resource Not Found", "Workbook {} not found".format(workbook_id))
+    config = ET.fromstring(body).find(".//dataAccelerationConfig")
+    with state.lock:
+        if config is not None and config.get("accelerationEnabled") is not None:
+            workbook["enabled"] = config.get("accelerationEnabled") == "true"
+            workbook["status"] = "waiting" if workbook["enabled"] else None
+            if not workbook["enabled"]:
+                state.tasks = [task for task in state.tasks if task["workbook_id"] != workbook_id]
+        workbook["updated_at"] = datetime.utcnow().replace(microsecond=0)
+    root = _ts_response()
+    _workbook_element(root, workbook, state.project_by_id())
+    handler._xml(root)
+
+
+def handle_tasks(handler, state, query, body, site_id):
+    page, pagination = handler._page(state.tasks, query)
+    schedules = state.schedule_by_id()
+    root = _ts_response()
+    _pagination(root, pagination)
+    tasks = ET.SubElement(root, "tasks")
+    for task in page:
+        task_element = ET.SubElement(ET.SubElement(tasks, "task"), "dataAcceleration",
+                                     id=task["id"], priority="50", consecutiveFailedCount="0",
+                                     type="MaterializeViewsTask")
+        _schedule_element(task_element, schedules[task["schedule_id"]])
+        ET.SubElement(task_element, "workbook", id=task["workbook_id"])
+    handler._xml(root)
+
+
+def handle_delete_task(handler, state, query, body, site_id, task_id):
+    with state.lock:
+        remaining = [task for task in state.tasks if task["id"] != task_id]
+        if len(remaining) == len(state.tasks):
+            return handler._error(404, "404000", "Resource Not Found", "Task {} not found".format(task_id))
+        state.tasks = remaining
+    handler._no_content()
+
+
+def handle_schedules(handler, state, query, body):
+    page, pagination = handler._page(state.schedules, query)
+    root = _ts_response()
+    _pagination(root, pagination)
+    schedules = ET.SubElement(root, "schedules")
+    for schedule in page:
+        _schedule_element(schedules, schedule)
+    handler._xml(root)
+
+
+def handle_create_schedule(handler, state, query, body):
+    request = ET.fromstring(body).find("schedule")
+    with state.lock:
+        if any(schedule["name"] == request.get("name") for schedule in state.schedules):
+            return handler._error(409, "409021", "Conflict", "Schedule name already exists")
+        schedule = {"id": "s{:07d}".format(len(state.schedules) + 1000000), "name": request.get("name"),
+                    "type": request.get("type"), "next_run_at": datetime.utcnow().replace(microsecond=0)}
+        state.schedules.append(schedule)
+    root = _ts_response()
+    _schedule_element(root, schedule)
+    handler._xml(root, 201)
+
+
+def handle_delete_schedule(handler, state, query, body, schedule_id):
+    with state.lock:
+        state.schedules = [schedule for schedule in state.schedules if schedule["id"] != schedule_id]
+        state.tasks = [task for task in state.tasks if task["schedule_id"] != schedule_id]
+    handler._no_content()
+
+
+def handle_add_to_schedule(handler, state, query, body, site_id, schedule_id):
+    workbook_id = ET.fromstring(body).find(".//workbook").get("id")
+    workbook = _find_workbook(state, workbook_id)
+    root = _ts_response()
+    if workbook is None:
+        return handler._error(404, "404006", "Resource Not Found", "Workbook {} not found".format(workbook_id))
+    with state.lock:
+        if not workbook["enabled"]:
+            warning = ET.SubElement(root, "warnings")
+            ET.SubElement(warning, "warning", message="Workbook Acceleration is not enabled for this workbook.")
+            return handler._xml(root)
+        if not any(task["workbook_id"] == workbook_id and task["schedule_id"] == schedule_id
+                   for task in state.tasks):
+            task = {"id": "t{:07d}x{}".format(len(state.tasks), uuid.uuid4().hex[:6]),
+                    "workbook_id": workbook_id, "schedule_id": schedule_id}
+            state.tasks.append(task)
+    task_element = ET.SubElement(ET.SubElement(root, "task"), "dataAcceleration", type="MaterializeViewsTask")
+    ET.SubElement(task_element, "workbook", id=workbook_id)
+    handler._xml(root)
+
+
+def handle_jobs(handler, state, query, body, site_id):
+    resolvers = {"completedAt": lambda job: job["ended_at"]}
+    page, pagination = handler._page(state.jobs, query, resolvers,
+                                     sort_keys={"completedAt": lambda job: job["ended_at"]})
+    root = _ts_response()
+    _pagination(root, pagination)
+    jobs = ET.SubElement(root, "backgroundJobs")
+    for job in page:
+        ET.SubElement(jobs, "backgroundJob", id=job["id"], status=job["status"],
+                      jobType=job["jobType"], priority="50", createdAt=_format_time(job["started_at"]),
+                      startedAt=_format_time(job["started_at"]), endedAt=_format_time(job["ended_at"]),
+                      title=job["title"], subtitle=job["subtitle"], notes=job["notes"])
+    handler._xml(root)
+
+
+def handle_report(handler, state, query, body, site_id):
+    root = _ts_response()
+    report = ET.SubElement(root, "dataAccelerationReport")
+    for record in state.comparison_records:
+        ET.SubElement(report, "comparisonRecord", site=state.site["content_url"], sheetURI=record["sheet_uri"],
+                      unacceleratedSessionCount=str(record["unaccelerated"]),
+                      averageNonAcceleratedPLT=str(record["avg_unaccelerated"]),
+                      acceleratedSessionCount=str(record["accelerated"]),
+                      averageAcceleratedPLT=str(record["avg_accelerated"]))
+    handler._xml(root)
+
+
+ROUTES = [
+    (r"^POST /api/\{v\}/auth/signin$", handle_signin, False),
+    (r"^POST /api/\{v\}/auth/signout$", handle_signout, True),
+    (r"^GET /api/\{v\}/serverInfo$", handle_server_info, False),
+    (r"^GET /api/\{v\}/sites$", handle_sites, True),
+    (r"^GET /api/\{v\}/sites/([^/]+)/projects$", handle_projects, True),
+    (r"^GET /api/\{v\}/sites/([^/]+)/workbooks$", handle_workbooks, True),
+    (r"^GET /api/\{v\}/sites/([^/]+)/workbooks/([^/]+)$", handle_workbook, True),
+    (r"^PUT /api/\{v\}/sites/([^/]+)/workbooks/([^/]+)$", handle_update_workbook, True),
+    (r"^GET /api/\{v\}/sites/([^/]+)/tasks/dataAcceleration$", handle_tasks, True),
+    (r"^DELETE /api/\{v\}/sites/([^/]+)/tasks/dataAcceleration/([^/]+)$", handle_delete_task, True),
+    (r"^PUT /api/\{v\}/sites/([^/]+)/schedules/([^/]+)/workbooks$", handle_add_to_schedule, True),
+    (r"^GET /api/\{v\}/sites/([^/]+)/jobs$", handle_jobs, True),
+    (r"^GET /api/\{v\}/sites/([^/]+)/dataAccelerationReport$", handle_report, True),
+    (r"^GET /api/\{v\}/sites/([^/]*)$", handle_site, True),
+    (r"^PUT /api/\{v\}/sites/([^/]+)$", handle_update_site, True),
+    (r"^GET /api/\{v\}/schedules$", handle_schedules, True),
+    (r"^POST /api/\{v\}/schedules$", handle_create_schedule, True),
+    (r"^DELETE /api/\{v\}/schedules/([^/]+)$", handle_delete_schedule, True),
+]
+
+
+class MockTableauServer(ThreadingMixIn, HTTPServer):
+    """
+    Serves one SyntheticSite on a thread per connection. request_counts holds the number of requests
+    per "METHOD /path" with the ids replaced by {id}, for benchmarks to report.
+    supports_in_operator and supports_fields turn off the filter and field list features that older
+    servers do not have, so the fallbacks of the script can be exercised too.
+    """
+    daemon_threads = True
+
+    def __init__(self, state, host="127.0.0.1", port=0, latency=0.0, password="password",
+                 supports_in_operator=True, supports_fields=True):
+        HTTPServer.__init__(self, (host, port), MockTableauHandler)
+        self.state = state
+        self.latency = latency
+        self.password = password
+        self.token = uuid.uuid4().hex
+        self.supports_in_operator = supports_in_operator
+        self.supports_fields = supports_fields
+        self.stats_lock = threading.Lock()
+        self.request_counts = Counter()
+        self.bytes_sent = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return "http://{}:{}".format(*self.server_address[:2])
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.request_counts.clear()
+            self.bytes_sent = 0
+
+    def total_requests(self):
+        with self.stats_lock:
+            return sum(self.request_counts.values())
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the Tableau Server REST API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--projects', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--workbooks', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=100)
+    parser.add_argument('--schedules', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--password', default='password')
+    args = parser.parse_args()
+
+    state = SyntheticSite(args.projects, args.depth, args.workbooks, args.tasks, args.schedules, seed=args.seed)
+    server = MockTableauServer(state, args.host, args.port, args.latency, args.password)
+    print(json.dumps({"url": server.url, "password": args.password}))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Runs accelerate_workbooks.py against the mock server of benchmarks/ and checks that, with --output csv
+or jsonl and no --output-file, the whole standard output parses as the report.
+
+    python -m unittest discover tests
+"""
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_tableau_server import MockTableauServer, SyntheticSite  # noqa: E402
+
+SCRIPT = os.path.join(ROOT, "accelerate_workbooks.py")
+
+COMMANDS = [
+    ["--status"],
+    ["--show-tasks"],
+    ["--compare"],
+    # prints a message for the path that is not found, and for the workbooks it reads the tasks of
+    ["--show-tasks", "--path-list", "paths.txt"],
+    ["--enable", "--type", "project-path", "--project-path", "Project 0"],
+]
+
+
+class ReportOutputTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = SyntheticSite(num_projects=10, depth=2, num_workbooks=60, num_tasks=20)
+        cls.server = MockTableauServer(cls.site).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def run_script(self, arguments):
+        # every run signs in from a new directory, where the token file and the caches are written
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        with open(os.path.join(directory, "paths.txt"), "w") as f:
+            f.write(self.site.workbook_path(self.site.workbooks[0]) + "\n")
+            f.write("Project 0/No Such Workbook\n")
+
+        command = [sys.executable, SCRIPT, "--server", self.server.url, "--username", "admin",
+                   "--password", self.server.password, "--site", ""] + arguments
+        result = subprocess.run(command, cwd=directory, input="a\n" * 10, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True,
+                                env=dict(os.environ, XDG_CACHE_HOME=directory))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Signed in to", result.stderr)
+        return result.stdout
+
+    def test_csv_output_is_only_the_report(self):
+        for arguments in COMMANDS:
+            with self.subTest(arguments=arguments):
+                stdout = self.run_script(arguments + ["--output", "csv"])
+                columns = None
+                for row in csv.reader(io.StringIO(stdout)):
+                    if row[0] == "Report":
+                        columns = row
+                        continue
+                    self.assertIsNotNone(columns, "a row before the header: {}".format(row))
+                    self.assertEqual(len(row), len(columns), "not a row of the report: {}".format(row))
+
+    def test_jsonl_output_is_only_the_report(self):
+        for arguments in COMMANDS:
+            with self.subTest(arguments=arguments):
+                stdout = self.run_script(arguments + ["--output", "jsonl"])
+                for line in stdout.splitlines():
+                    record = json.loads(line)
+                    self.assertIn("report", record)
+
+
+if __name__ == "__main__":
+    unittest.main()
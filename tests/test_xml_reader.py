@@ -0,0 +1,88 @@
+"""
+Checks that the streaming readers of workbook, task and job pages return the same items and pagination
+as the TSC from_response methods, on the pages in benchmarks/fixtures and on the synthetic pages of
+benchmarks/bench_xml_reader.py. Only the attributes the commands read are compared.
+
+    python -m unittest discover tests
+
+The fixtures were recorded from the mock server with accelerate_workbooks.py --record. More pages
+recorded from a server, one page per file named workbooks*.xml, tasks*.xml or jobs*.xml like the
+directories written by --record, are also checked when RECORDED_RESPONSES is set to their directory.
+The responses of such a directory that are not pages of a list, like empty bodies, updated items and
+errors, are skipped.
+"""
+import glob
+import os
+import sys
+import unittest
+import xml.etree.ElementTree as ET
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import tableauserverclient as TSC  # noqa: E402
+from accelerate_workbooks import xmlns  # noqa: E402
+from bench_xml_reader import READERS, streaming_reader, synthetic_jobs, synthetic_tasks, \
+    synthetic_workbooks  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+# the element holding the items of a page of each kind
+COLLECTIONS = {"workbooks": "workbooks", "tasks": "tasks", "jobs": "backgroundJobs"}
+
+SYNTHETIC_PAGES = {"workbooks": synthetic_workbooks, "tasks": synthetic_tasks, "jobs": synthetic_jobs}
+
+
+def is_list_page(kind, content):
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return False
+    return root.find('t:{}'.format(COLLECTIONS[kind]), namespaces=xmlns) is not None and \
+        root.find('t:pagination', namespaces=xmlns) is not None
+
+
+def recorded_pages(directory):
+    for kind in READERS:
+        for file_name in sorted(glob.glob(os.path.join(directory, "{}*.xml".format(kind)))):
+            with open(file_name, 'rb') as f:
+                content = f.read()
+            if is_list_page(kind, content):
+                yield kind, file_name, content
+
+
+class XmlReaderTest(unittest.TestCase):
+
+    def assert_same_items(self, kind, content):
+        tsc, to_record = READERS[kind][2:]
+        items, pagination_item = streaming_reader(kind)(content)
+        tsc_records = [to_record(item) for item in tsc(content)]
+        self.assertGreater(len(tsc_records), 0)
+        self.assertEqual([to_record(item) for item in items], tsc_records)
+        tsc_pagination_item = TSC.PaginationItem.from_response(content, xmlns)
+        self.assertEqual(
+            (pagination_item.page_number, pagination_item.page_size, pagination_item.total_available),
+            (tsc_pagination_item.page_number, tsc_pagination_item.page_size, tsc_pagination_item.total_available))
+
+    def test_fixtures(self):
+        pages = list(recorded_pages(FIXTURES))
+        self.assertEqual(sorted(kind for kind, file_name, content in pages), sorted(READERS))
+        for kind, file_name, content in pages:
+            with self.subTest(page=file_name):
+                self.assert_same_items(kind, content)
+
+    def test_synthetic_pages(self):
+        for kind, synthetic_page in SYNTHETIC_PAGES.items():
+            with self.subTest(kind=kind):
+                self.assert_same_items(kind, synthetic_page(200))
+
+    @unittest.skipUnless(os.environ.get("RECORDED_RESPONSES"), "RECORDED_RESPONSES is not set")
+    def test_recorded_responses(self):
+        for kind, file_name, content in recorded_pages(os.environ["RECORDED_RESPONSES"]):
+            with self.subTest(page=file_name):
+                self.assert_same_items(kind, content)
+
+
+if __name__ == "__main__":
+    unittest.main()